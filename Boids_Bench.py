@@ -0,0 +1,231 @@
+#-----------------------------------------------------
+#BOIDS BENCHMARK CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+from Boids_Sim import sim_var, initialize_boids, Flock, SpatialGrid, find_closest, integrate_boids
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#USE PARSER FOR COMMAND LINE ARGUMENTS
+parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter,
+        description='Benchmark of the boids simulation phases across flock sizes and toggle combinations.',
+        epilog = 'For more information on this software, contact Jordan Ducatel at jfducatel@gmail.com.')
+parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000],
+                    help='Flock sizes to benchmark. Default: 10 100 1000 10000 100000')
+parser.add_argument('--repeats', type=int, default=5,
+                    help='Number of timed repeats of each phase. Default: 5')
+parser.add_argument('--warmup', type=int, default=10,
+                    help='Number of steps simulated before timing, to let the flock form. Default: 10')
+parser.add_argument('--seed', type=int, default=1234,
+                    help='Random seed. Default: 1234')
+parser.add_argument('--float32', action='store_true',
+                    help='Store the flock in single precision float arrays instead of double precision.')
+parser.add_argument('--no-render', action='store_true',
+                    help='Skip the rendering phases. They are also skipped if pygame is not installed.')
+parser.add_argument('--output', default='bench_results.json',
+                    help='JSON file the results are written to. Default: bench_results.json')
+parser.add_argument('--compare', metavar='BASELINE',
+                    help='JSON results file of a previous run. Phases slower than the baseline are\nreported and the exit code is 1.')
+parser.add_argument('--threshold', type=float, default=0.2,
+                    help='Relative slowdown of the median time flagged as regression. Default: 0.2')
+parser.add_argument('--min-delta', type=float, default=0.05,
+                    help='Absolute slowdown in ms below which no regression is flagged. Default: 0.05')
+args = parser.parse_args()
+dtype = np.dtype(np.float32 if args.float32 else np.float64)
+
+#Baseline results, only comparable if run with the same float type:
+baseline = None
+if args.compare:
+    with open(args.compare) as file:
+        baseline = json.load(file)
+    baseline_dtypes = {entry.get('dtype', baseline.get('dtype', 'float64')) for entry in baseline['results']}
+    if baseline_dtypes != {dtype.name}:
+        parser.error('baseline {} was run with {} flocks, not {}; use the same --float32 option'.format(
+            args.compare, ' and '.join(sorted(baseline_dtypes)), dtype.name))
+#----------------------------------------------
+
+
+#----------------------------------------------
+#IMPORT RENDER MODULES IF AVAILABLE
+render = not args.no_render
+if render:
+    try:
+        import pygame
+        from Boids_Render import draw_boids, SpriteCache
+    except ImportError:
+        print('pygame not available, rendering phases are skipped.')
+        render = False
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define phase timing function:
+def time_phase(function, repeats, setup=None):
+    '''
+    Description:
+        Time a phase of the simulation several times.
+    Input:
+        function: phase to time, called with the output of setup if given. dtype: callable
+        repeats: number of timed calls. dtype: int
+        setup: untimed function preparing the phase inputs before each call. dtype: callable
+    Output:
+        timing: minimum and median time of the calls. unit: ms. dtype: dict
+    '''
+    times = []
+    for repeat in range(repeats):
+        inputs = setup() if setup is not None else ()
+        time_start = time.perf_counter()
+        function(*inputs)
+        times.append(1e3 * (time.perf_counter() - time_start))
+    return {'min ms': float(np.min(times)), 'median ms': float(np.median(times))}
+
+
+#Define flock size benchmark:
+def benchmark_size(N, repeats):
+    '''
+    Description:
+        Time the phases which do not depend on the toggles: initialization and rendering.
+    Input:
+        N: number of boids. dtype: int
+        repeats: number of timed repeats of each phase. dtype: int
+    Output:
+        results: one entry per phase. dtype: list of dict
+    '''
+    rng = np.random.default_rng(args.seed)
+    results = [dict(phase='initialize', **time_phase(lambda: initialize_boids(N, rng=rng), repeats))]
+    if render:
+        t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, t_colors, case_study_original_color = initialize_boids(N, rng=rng)
+        surface = pygame.Surface((sim_var['width'], sim_var['height']))
+        sprites = SpriteCache()
+        draw_boids(surface, t_x0_i, t_y0_i, t_angle_i, t_colors, sprites=sprites) #Render sprites once
+        results.append(dict(phase='render polygons',
+                            **time_phase(lambda: draw_boids(surface, t_x0_i, t_y0_i, t_angle_i, t_colors), repeats)))
+        results.append(dict(phase='render sprites',
+                            **time_phase(lambda: draw_boids(surface, t_x0_i, t_y0_i, t_angle_i, t_colors, sprites=sprites), repeats)))
+    for result in results:
+        result.update({'N': N, 'dtype': dtype.name, 'separation': None, 'alignment': None, 'cohesion': None, 'edges': None})
+    return results
+
+
+#Define toggle combination benchmark:
+def benchmark_flock(N, separation, alignment, cohesion, edges, repeats, warmup):
+    '''
+    Description:
+        Time the simulation phases of a flock for a toggle combination: neighbour search with the spatial
+        grid, steering, position integration, loop around edges and, with edges, the closest boid search
+        across periodic edges.
+    Input:
+        N: number of boids. dtype: int
+        separation, alignment, cohesion, edges: toggles. dtype: bool
+        repeats: number of timed repeats of each phase. dtype: int
+        warmup: number of steps simulated before timing. dtype: int
+    Output:
+        results: one entry per phase. dtype: list of dict
+    '''
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    toggles = {'separation': separation, 'alignment': alignment, 'cohesion': cohesion}
+    flock = Flock(N, dtype=dtype, seed=args.seed)
+    for step in range(warmup):
+        if edges:
+            flock.loop_around_edges()
+        flock.step(SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest(), **toggles)
+    closest_index = SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest()
+    flock.steer(closest_index, **toggles)
+
+    results = []
+    if edges:
+        results.append(dict(phase='edges', **time_phase(flock.loop_around_edges, repeats)))
+    results.append(dict(phase='neighbours',
+                        **time_phase(lambda: SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest(), repeats)))
+    results.append(dict(phase='steering', **time_phase(lambda: flock.steer(closest_index, **toggles), repeats)))
+    results.append(dict(phase='integration',
+                        **time_phase(lambda *arrays: integrate_boids(*arrays, scratch=flock.scratch), repeats,
+                                     setup=lambda: (flock.t_x0_i.copy(), flock.t_y0_i.copy(), flock.t_vx0_i.copy(),
+                                                    flock.t_vy0_i.copy(), flock.new_angle))))
+    if edges:
+        #Period of the periodic edges, see edge_period:
+        period = (1 - 2*(sim_var['bounding box scale'] - sim_var['loop around buffer']),) * 2
+        results.append(dict(phase='neighbours periodic',
+                            **time_phase(lambda: find_closest(flock.t_x0_i, flock.t_y0_i, period=period), repeats)))
+    for result in results:
+        result.update({'N': N, 'dtype': dtype.name, 'edges': edges, **toggles})
+    return results
+
+
+#Define comparison to baseline:
+def compare_results(results, baseline, threshold, min_delta):
+    '''
+    Description:
+        Find the phases whose median time got slower than in the baseline.
+    Input:
+        results, baseline: benchmark entries. dtype: list of dict
+        threshold: relative slowdown flagged as regression. dtype: float
+        min_delta: absolute slowdown below which no regression is flagged. unit: ms. dtype: float
+    Output:
+        regressions: (entry, baseline median, current median) of each regression. dtype: list of tuple
+    '''
+    keys = ('N', 'separation', 'alignment', 'cohesion', 'edges', 'phase')
+    baseline_median = {tuple(entry[key] for key in keys): entry['median ms'] for entry in baseline}
+    regressions = []
+    for entry in results:
+        old = baseline_median.get(tuple(entry[key] for key in keys))
+        if old is None:
+            continue
+        new = entry['median ms']
+        if new > old * (1 + threshold) and new - old > min_delta:
+            regressions.append((entry, old, new))
+    return regressions
+#----------------------------------------------
+
+
+#----------------------------------------------
+#RUN BENCHMARK:
+results = []
+for N in args.sizes:
+    results += benchmark_size(N, args.repeats)
+    for separation, alignment, cohesion, edges in itertools.product([True, False], repeat=4):
+        entries = benchmark_flock(N, separation, alignment, cohesion, edges, args.repeats, args.warmup)
+        results += entries
+        print('N={:<7d} S={:d} A={:d} C={:d} E={:d}  '.format(N, separation, alignment, cohesion, edges) +
+              '  '.join('{} {:.3f} ms'.format(entry['phase'], entry['median ms']) for entry in entries))
+    for entry in results:
+        if entry['N'] == N and entry['edges'] is None:
+            print('N={:<7d} {} {:.3f} ms'.format(N, entry['phase'], entry['median ms']))
+
+with open(args.output, 'w') as file:
+    json.dump({'python': platform.python_version(),
+               'numpy': np.__version__,
+               'platform': platform.platform(),
+               'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+               'repeats': args.repeats,
+               'warmup': args.warmup,
+               'seed': args.seed,
+               'dtype': dtype.name,
+               'results': results}, file, indent=1)
+print('Results written to {}'.format(args.output))
+
+if baseline is not None:
+    regressions = compare_results(results, baseline['results'], args.threshold, args.min_delta)
+    for entry, old, new in regressions:
+        toggles = ' '.join('{}={}'.format(key, entry[key]) for key in ('separation', 'alignment', 'cohesion', 'edges')
+                           if entry[key] is not None)
+        print('REGRESSION N={} {} {}: {:.3f} ms -> {:.3f} ms ({:+.0f} %)'.format(entry['N'], toggles, entry['phase'],
+                                                                              old, new, 100 * (new / old - 1)))
+    print('{} regression(s) against {}'.format(len(regressions), args.compare))
+    if regressions:
+        sys.exit(1)
+#----------------------------------------------
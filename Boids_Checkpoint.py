@@ -0,0 +1,78 @@
+#-----------------------------------------------------
+#BOIDS CHECKPOINT CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import json
+from Boids_Sim import sim_var, palette, Flock
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Checkpoint format version, increased when the content changes:
+checkpoint_version = 1
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define checkpoint saving function:
+def save_checkpoint(path, flock, toggles=None):
+    '''
+    Description:
+        Save the full state of a simulation in a binary .npz file: the flock arrays, at their float type,
+        and a JSON header with the palette, simulation variables, toggles and random number generator
+        state of the flock. Arrays are not compressed so that saving and loading are fast.
+    Input:
+        path: checkpoint file path, written as is. dtype: str
+        flock: flock to save. dtype: Flock
+        toggles: toggle values by name, e.g. separation, alignment, cohesion, edges, paused. dtype: dict
+    '''
+    header = {'version': checkpoint_version,
+              'N': flock.N,
+              'dtype': flock.dtype.name,
+              'palette': palette,
+              'sim_var': sim_var,
+              'toggles': toggles or {},
+              'rng state': flock.rng.bit_generator.state}
+    arrays = {key: getattr(flock, key) for key in Flock.flock_arrays}
+    with open(path, 'wb') as file:
+        np.savez(file, header=np.frombuffer(json.dumps(header).encode(), dtype=np.uint8), **arrays)
+    return
+
+
+#Define checkpoint loading function:
+def load_checkpoint(path):
+    '''
+    Description:
+        Load a checkpoint saved by save_checkpoint. The simulation variables are updated in place with
+        those of the checkpoint, and the flock continues bit for bit as the saved one would have, including
+        the boids drawn when it grows.
+    Input:
+        path: checkpoint file path. dtype: str
+    Output:
+        flock: restored flock. dtype: Flock
+        toggles: toggle values by name saved with the flock. dtype: dict
+    '''
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(data['header'].tobytes().decode())
+        if header['version'] != checkpoint_version:
+            raise ValueError('Checkpoint {} has version {}, expected {}.'.format(path, header['version'], checkpoint_version))
+        if header['palette'] != palette:
+            raise ValueError('Checkpoint {} was saved with another boids palette: {}.'.format(path, header['palette']))
+        sim_var.update(header['sim_var'])
+
+        flock = Flock(0, dtype=header['dtype'], capacity=header['N'])
+        flock.N = header['N']
+        flock.set_views()
+        for key in Flock.flock_arrays:
+            getattr(flock, key)[:] = data[key]
+    flock.rng.bit_generator.state = header['rng state']
+    return flock, header['toggles']
+#----------------------------------------------
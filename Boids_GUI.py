@@ -1,19 +1,21 @@
 #-----------------------------------------------------
 #BOIDS GUI CODE
-#Last Updated: Jan. 19, 2024
+#Last Updated: Oct. 17, 2026
 #See README.md file for information
 #-----------------------------------------------------
 
 
 #-----------------------------------------------------
 #IMPORT MODULES
-import pygame
-import pygame_widgets
-from pygame_widgets.toggle import Toggle
-from pygame_widgets.slider import Slider
 import numpy as np
 import os
+import sys
 import argparse
+from Boids_Sim import sim_var, palette, Flock, SpatialGrid, edge_period, find_closest, run_headless
+from Boids_Record import Recorder, Replay
+from Boids_Profile import Profiler
+from Boids_Checkpoint import save_checkpoint, load_checkpoint
+from Boids_Stream import StreamServer
 #-----------------------------------------------------
 
 
@@ -22,125 +24,107 @@ import argparse
 parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter,
         description='Python simulation of flock behaviors, i.e. Boids, with focus on graphical user interface and visuals using pygame.',
         epilog = 'For more information on this software, contact Jordan Ducatel at jfducatel@gmail.com.')
+parser.add_argument('--headless', action='store_true',
+                    help='Run the simulation without GUI, pygame is not imported.\nPrints timing and summary statistics.')
+parser.add_argument('--steps', type=int, default=1000,
+                    help='Number of steps to simulate in headless mode. Default: 1000')
+parser.add_argument('--boids', type=int, default=sim_var['number of triangles'],
+                    help='Number of boids. Default: {}'.format(sim_var['number of triangles']))
+parser.add_argument('--seed', type=int, default=1234,
+                    help='Random seed. Default: 1234')
+parser.add_argument('--no-separation', action='store_true', help='Start with separation disabled.')
+parser.add_argument('--no-alignment', action='store_true', help='Start with alignment disabled.')
+parser.add_argument('--no-cohesion', action='store_true', help='Start with cohesion disabled.')
+parser.add_argument('--no-edges', action='store_true', help='Start with loop around edges disabled.')
+parser.add_argument('--processes', type=int, default=0,
+                    help='Number of worker processes of the parallel engine in headless mode.\nDefault: 0 (serial)')
+parser.add_argument('--sprites', type=int, default=0,
+                    help='Draw boids from triangles pre-rendered at SPRITES angles instead of polygons.\nDefault: 0 (polygons)')
+parser.add_argument('--max-boids', type=int,
+                    help='Maximum number of boids of the boids number slider. Default: {}'.format(sim_var['max number of triangles']))
+parser.add_argument('--threaded', action='store_true',
+                    help='Run the simulation steps in a worker thread on a fixed timestep, and draw the boids\ninterpolated between the two latest steps.')
+parser.add_argument('--sim-speed', type=float, default=1.0,
+                    help='Simulation time per real time of the threaded mode, 0 to run the steps as fast as\npossible. Default: 1.0')
+parser.add_argument('--render-fps', type=int, default=sim_var['fps'],
+                    help='Display frame rate of the threaded mode. Default: {}'.format(sim_var['fps']))
+parser.add_argument('--record', metavar='DIRECTORY',
+                    help='Record the flock of each step in DIRECTORY, in the GUI and headless modes.')
+parser.add_argument('--chunk-frames', type=int, default=256,
+                    help='Number of frames per chunk file of a recording. Default: 256')
+parser.add_argument('--replay', metavar='DIRECTORY',
+                    help='Replay the recording in DIRECTORY instead of simulating. Left / right arrow keys seek\nby one second, Home goes back to the first frame.')
+parser.add_argument('--replay-frame', type=int, default=0,
+                    help='First frame of the replay. Default: 0')
+parser.add_argument('--profile', action='store_true',
+                    help='Start with the phase timers and their overlay in the control box switched on.\nThe P key switches them on and off.')
+parser.add_argument('--profile-output', metavar='FILE',
+                    help='Write the phase timers to FILE at exit: Chrome trace event JSON if FILE ends\nwith .json, CSV otherwise.')
+parser.add_argument('--periodic', action='store_true',
+                    help='Periodic loop around edges: boids leaving the box enter it on the opposite side and see\nthe boids across the edges. The parallel engine is not used.')
+parser.add_argument('--float32', action='store_true',
+                    help='Store the flock in single precision float arrays instead of double precision.')
+parser.add_argument('--render-mode', choices=('auto', 'triangles', 'points', 'density', 'heading'), default='auto',
+                    help='Flock render mode: triangles, points, density or heading heatmap. auto draws points\nabove LOD_THRESHOLD boids. The M key cycles the modes. Default: auto')
+parser.add_argument('--lod-threshold', type=int,
+                    help='Number of boids above which the auto render mode draws points instead of triangles.\nDefault: {}'.format(sim_var['point render threshold']))
+parser.add_argument('--checkpoint', metavar='FILE',
+                    help='Save the flock, simulation variables, toggles and random state to FILE at the end\nof the headless mode, or when the S key is pressed in the GUI. Default in the GUI:\ncheckpoint.npz')
+parser.add_argument('--stream', metavar='ADDRESS',
+                    help='Publish the flock of each step to viewers (Boids_Viewer.py) connected to ADDRESS:\nHOST:PORT or PORT for TCP, unix:PATH for a Unix socket. Slow viewers skip frames.')
+parser.add_argument('--restore', metavar='FILE',
+                    help='Start from the checkpoint in FILE instead of a random flock, with its simulation\nvariables and toggles. --periodic, --max-boids, --lod-threshold and --no-*\noptions given on the command line replace those of the checkpoint.')
+args = parser.parse_args()
 #----------------------------------------------
 
 
 #----------------------------------------------
-#set ranodm seed:
-np.random.seed(1234)
+#Restore checkpoint, if enabled, the flock random generator is otherwise seeded with args.seed:
+restored_flock, start_toggles = load_checkpoint(args.restore) if args.restore else (None, {})
+
+#Options given on the command line replace the simulation variables, restored from the checkpoint or default:
+sim_var['number of triangles'] = restored_flock.N if restored_flock is not None else args.boids
+if args.max_boids is not None:
+    sim_var['max number of triangles'] = args.max_boids
+sim_var['max number of triangles'] = max(sim_var['max number of triangles'], sim_var['number of triangles'])
+if args.periodic:
+    sim_var['periodic edges'] = True
+if args.lod_threshold is not None:
+    sim_var['point render threshold'] = args.lod_threshold
+for toggle_name in ('separation', 'alignment', 'cohesion', 'edges'):
+    if getattr(args, 'no_' + toggle_name):
+        start_toggles[toggle_name] = False
+if sim_var['periodic edges'] and args.processes > 0:
+    parser.error('the parallel engine does not support periodic edges')
 #----------------------------------------------
 
 
 #----------------------------------------------
-#DEFINE FUNCTION:
-#Define Triangle drawing function:
-def draw_triangle(t_x0_rel, t_y0_rel, t_angle, t_color):
-    '''
-    Description:
-        Draws a pygame polygon object that is a triangle with a given orientation.
-    Input:
-        t_x0, t_y0: relative center coordinates of triangle. Range between zero and one. dtype: int or float
-        t_angle: Orientation angle for triangle. Units: rad. dtype: int/float
-        t_color: RGB color of triangle. format: (R, G, B). dtype: tuple
-    '''
-    t_x0 = t_x0_rel*sim_var['width']
-    t_y0 = t_y0_rel*sim_var['height']
-    t_width = sim_var['t_size']*sim_var['width']
-    t_height = 1.5 * t_width
-    t_x4 = t_x0 - 0.3 * t_height * np.cos(t_angle)
-    t_y4 = t_y0 - 0.3 * t_height * np.sin(t_angle)
-    t_x1 = t_x4 - 0.5 * t_width * np.sin(t_angle)
-    t_y1 = t_y4 + 0.5 * t_width * np.cos(t_angle)
-    t_x2 = t_x4 + 0.5 * t_width * np.sin(t_angle)
-    t_y2 = t_y4 - 0.5 * t_width * np.cos(t_angle)
-    t_x3 = t_x0 + 0.7 * t_height * np.cos(t_angle)
-    t_y3 = t_y0 + 0.7 * t_height * np.sin(t_angle)
-
-    pygame.draw.polygon(screen, t_color, [[t_x1, t_y1], [t_x2, t_y2], [t_x3, t_y3]])
-    return
-
-
-#Define loop around edges function:
-def loop_around_edges(t_x0, t_y0):
-    '''
-    Description:
-        Update the input t_x0 and t_y0 variables to loop around the edges of the bouding box of the similation.
-    Input:
-        t_x0, t_y0: relative center coordinates of triangle. dtype: int or float
-    Output:
-        t_x0, t_y0: relative center coordinates of triangle. dtype: int or float        
-    '''
-    if t_x0 < (sim_var['bounding box scale'] - sim_var['loop around buffer']):
-        t_x0 = 1 - t_x0 - sim_var['loop around correction']
-    if t_x0 > 1 - (sim_var['bounding box scale'] - sim_var['loop around buffer']):
-        t_x0 = 1 - t_x0 + sim_var['loop around correction']
-    if t_y0 < (sim_var['bounding box scale'] - sim_var['loop around buffer']):
-        t_y0 = 1 - t_y0 - sim_var['loop around correction']
-    if t_y0 > 1 - (sim_var['bounding box scale'] - sim_var['loop around buffer']):
-        t_y0 = 1 - t_y0 + sim_var['loop around correction']
-    return t_x0, t_y0
-
-
-#Define boids initialization
-def initialize_boids(N):
-    '''
-    Description:
-        Initialize an array of boids location, velocities and colors.
-    Input:
-        N: number of boids to initialize. dtype: int.
-    Output:
-        t_x0_i: Initial x position. unit: pix. dtype: 1D array
-        t_y0_i: Initial y position. unit: pix. dtype: 1D array
-        t_angle_i: Initial angle position. unit: rad. dtype: 1D array
-        t_vx0_i: Initial x velocity. unit: pix / frame. dtype: 1D array
-        t_vy0_i: Initial y velocity. unit: pix / frame. dtype: 1D array
-        t_colors: Boids individual colors. element format: (R, G, B). dtype: 1D array
-        case_study_original_color: Test study Boid color. format: (R, G, B). dtype: tupple
-    '''
-    t_x0_i = np.random.uniform(low=sim_var['bounding box scale'], high=1-sim_var['bounding box scale'], size=N)
-    t_y0_i = np.random.uniform(low=sim_var['bounding box scale'], high=1-sim_var['bounding box scale'], size=N)
-    t_angle_i = np.random.uniform(low=-np.pi, high=np.pi, size=N)
-    t_vx0_i = sim_var['t_speed'] * np.cos(t_angle_i)
-    t_vy0_i = sim_var['t_speed'] * np.sin(t_angle_i)
-    t_colors = np.random.choice(['lightblue', 'blue', 'darkblue'], size=N)
-    case_study_original_color = t_colors[0]
-    return t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, t_colors, case_study_original_color
+#RUN HEADLESS SIMULATION:
+if args.headless:
+    headless_toggles = {toggle_name: start_toggles.get(toggle_name, True) for toggle_name in ('separation', 'alignment', 'cohesion', 'edges')}
+    flock = run_headless(args.boids, args.steps,
+                         processes=args.processes,
+                         dtype=np.float32 if args.float32 else np.float64,
+                         recorder=Recorder(args.record, chunk_frames=args.chunk_frames) if args.record else None,
+                         seed=args.seed, flock=restored_flock,
+                         stream=StreamServer(args.stream).start() if args.stream else None, **headless_toggles)
+    if args.checkpoint:
+        save_checkpoint(args.checkpoint, flock, toggles=dict(start_toggles, **headless_toggles))
+        print('Checkpoint written to {}'.format(args.checkpoint))
+    sys.exit()
 #----------------------------------------------
 
 
-
-#----------------------------------------------
-#DEFINE VARIABLES
-#define colors dictionary:
-color = {'red':(204, 0, 0),
-         'darkred':(153, 0, 0),
-         'darkdarkred':(102, 0, 0),
-         'darkgray':(32, 32, 32),
-         'white':(255, 255, 255),
-         'lightgray':(128, 128, 128),
-         'lightblue':(153, 204, 255),
-         'blue':(51, 153, 255),
-         'darkblue':(0, 102, 204),
-         'darkgreen':(0, 204, 102)}
-
-
-
-#Define Global variable for the simulation:
-sim_var = {'width': 640,
-           'height': 480,
-           'fps': 30,
-           'bounding box scale': 0.1,
-           't_size': 0.01,
-           't_speed': 0.2,
-           'loop around buffer': 0.05,
-           'collision strength': 0.1,
-           'alignment strength': 0.04,
-           'cohesion scale': 0.05,
-           'number of triangles': 50,
-           'controls box scale': 0.6,
-           'toggle scale': 0.03,
-           'loop around correction': 0.005}
-#----------------------------------------------
+#-----------------------------------------------------
+#IMPORT GUI MODULES
+import pygame
+import pygame_widgets
+from pygame_widgets.toggle import Toggle
+from pygame_widgets.slider import Slider
+from Boids_Render import color, render_modes, draw_boids, draw_flock, draw_profile, SpriteCache
+from Boids_Thread import SimulationThread
+#-----------------------------------------------------
 
 
 #----------------------------------------------
@@ -153,13 +137,19 @@ pygame.display.set_caption("Boid Simulation")
 
 screen = pygame.display.set_mode((sim_var['width'] * (1+sim_var['controls box scale']), sim_var['height']))
 clock = pygame.time.Clock()
+
+#Pre-rendered triangles, if enabled:
+sprite_cache = SpriteCache(K=args.sprites) if args.sprites > 0 else None
 #----------------------------------------------
 
 
 #----------------------------------------------
 #Initialize randomly triangles position and velocity:
-N = sim_var['number of triangles']
-t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, t_colors, case_study_original_color = initialize_boids(sim_var['number of triangles'])
+if restored_flock is not None:
+    flock = restored_flock
+else:
+    flock = Flock(sim_var['number of triangles'], dtype=np.float32 if args.float32 else np.float64, seed=args.seed)
+N = sim_var['number of triangles'] = flock.N
 #----------------------------------------------
 
 
@@ -168,6 +158,7 @@ t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, t_colors, case_study_original_color
 #Define text parameters for controls:
 font_1 = pygame.font.Font('freesansbold.ttf', 32)
 font_2 = pygame.font.Font('freesansbold.ttf', 20)
+font_3 = pygame.font.Font('freesansbold.ttf', 11)
 
 text_1 = font_1.render('Controls', True, color['white'], color['darkgray'])
 text_2 = font_2.render('Boids #', True, color['white'], color['darkgray'])
@@ -234,26 +225,26 @@ toggle_6 = Toggle(screen,
                   int(sim_var['height'] * ((2+3*3+1)*sim_var['loop around buffer'])), 
                   int(sim_var['toggle scale'] * 2 * sim_var['width']),
                   int(sim_var['toggle scale'] * sim_var['height']),
-                  startOn=True)
+                  startOn=start_toggles.get('edges', True))
 toggle_7 = Toggle(screen, 
                   int(sim_var['width'] * (1 + (sim_var['controls box scale'] - sim_var['loop around buffer'])*3/4) - (sim_var['toggle scale'] * 2 * sim_var['width'])/2), 
                   int(sim_var['height'] * ((2+3*3+1)*sim_var['loop around buffer'])), 
                   int(sim_var['toggle scale'] * 2 * sim_var['width']),
                   int(sim_var['toggle scale'] * sim_var['height']),
-                  startOn=True)
+                  startOn=start_toggles.get('separation', True))
 
 toggle_8 = Toggle(screen, 
                   int(sim_var['width'] * (1 + (sim_var['controls box scale'] - sim_var['loop around buffer'])*1/4) - (sim_var['toggle scale'] * 2 * sim_var['width'])/2), 
                   int(sim_var['height'] * ((2+3*4+1)*sim_var['loop around buffer'])), 
                   int(sim_var['toggle scale'] * 2 * sim_var['width']),
                   int(sim_var['toggle scale'] * sim_var['height']),
-                  startOn=True)
+                  startOn=start_toggles.get('alignment', True))
 toggle_9 = Toggle(screen, 
                   int(sim_var['width'] * (1 + (sim_var['controls box scale'] - sim_var['loop around buffer'])*3/4) - (sim_var['toggle scale'] * 2 * sim_var['width'])/2), 
                   int(sim_var['height'] * ((2+3*4+1)*sim_var['loop around buffer'])), 
                   int(sim_var['toggle scale'] * 2 * sim_var['width']),
                   int(sim_var['toggle scale'] * sim_var['height']),
-                  startOn=True)
+                  startOn=start_toggles.get('cohesion', True))
 
 #Add slider for boid number:
 slider_2 = Slider(screen,
@@ -261,194 +252,273 @@ slider_2 = Slider(screen,
                   int(sim_var['height'] * ((2+3*1+1)*sim_var['loop around buffer'])), 
                   int(sim_var['toggle scale'] * 4 * sim_var['width']),
                   int(sim_var['toggle scale'] * sim_var['height']),
-                  min=1, max=100, step=1, initial=50,
+                  min=1, max=sim_var['max number of triangles'], step=1, initial=N,
                   colour=(141, 185, 244),
                   handleColour=(26, 115, 232))
 
 slider_2_value_old = slider_2.getValue()
+
+#Toggles saved in checkpoints, set from the restored checkpoint:
+gui_toggles = {'paused': toggle_3, 'case study': toggle_4, 'nearest': toggle_5, 'edges': toggle_6,
+               'separation': toggle_7, 'alignment': toggle_8, 'cohesion': toggle_9}
+for toggle_name, toggle in gui_toggles.items():
+    if toggle_name in start_toggles and toggle.getValue() != start_toggles[toggle_name]:
+        toggle.toggle()
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE STATIC LAYER
+#Boxes, control box and labels are drawn once on a cached background:
+background = pygame.Surface(screen.get_size()).convert()
+background.fill(color['darkgray']) #Define background color
+
+#Draw box enclosure for simulation:
+pygame.draw.rect(background, color['lightgray'], 
+                 (sim_var['bounding box scale']*sim_var['width'], 
+                  sim_var['bounding box scale']*sim_var['height'], 
+                  (1-2*sim_var['bounding box scale'])*sim_var['width'], 
+                  (1-2*sim_var['bounding box scale'])*sim_var['height']), 
+                 width=3)
+                 
+#Draw buffer box enclosure for loop around:
+pygame.draw.rect(background, color['white'], 
+                 ((sim_var['bounding box scale'] - sim_var['loop around buffer'])*sim_var['width'], 
+                  (sim_var['bounding box scale'] - sim_var['loop around buffer'])*sim_var['height'], 
+                  (1-2*(sim_var['bounding box scale'] - sim_var['loop around buffer']))*sim_var['width'], 
+                  (1-2*(sim_var['bounding box scale'] - sim_var['loop around buffer']))*sim_var['height']), 
+                 width=3)
+
+#Draw control box
+pygame.draw.rect(background, color['white'], 
+                 ((1)*sim_var['width'], 
+                 (sim_var['loop around buffer'])*sim_var['height'], 
+                 (sim_var['controls box scale'] - sim_var['loop around buffer'])*sim_var['width'], 
+                 (1 - 2*sim_var['loop around buffer'])*sim_var['height']), 
+                 width=3)
+
+#Add text in control box:
+background.blit(text_1, textRect_1)
+background.blit(text_2, textRect_2)
+background.blit(text_3, textRect_3)
+background.blit(text_4, textRect_4)
+background.blit(text_5, textRect_5)
+background.blit(text_6, textRect_6)
+background.blit(text_7, textRect_7)
+background.blit(text_8, textRect_8)
+background.blit(text_9, textRect_9)
+
+#Screen regions, only the simulation viewport is updated every frame:
+viewport_rect = pygame.Rect(0, 0, sim_var['width'], sim_var['height'])
+panel_rect = pygame.Rect(sim_var['width'], 0, screen.get_width() - sim_var['width'], sim_var['height'])
+widgets = [slider_2, toggle_3, toggle_4, toggle_5, toggle_6, toggle_7, toggle_8, toggle_9]
+widgets_value_old = None
+
+#Profiling overlay region, at the bottom of the control box:
+profile_rect = pygame.Rect(sim_var['width'] + 12, int(0.8 * sim_var['height']),
+                           int((sim_var['controls box scale'] - sim_var['loop around buffer']) * sim_var['width']) - 24,
+                           int(0.15 * sim_var['height']) - 6)
 #----------------------------------------------
 
 
 #----------------------------------------------
 #RUN PYGAME GUI:
+screen.blit(background, (0, 0))
+pygame.display.update()
+
+#Recording or replay, if enabled:
+recorder = Recorder(args.record, chunk_frames=args.chunk_frames) if args.record and not args.replay else None
+replay = Replay(args.replay) if args.replay else None
+if replay is not None and len(replay) == 0:
+    parser.error('recording {} has no frames'.format(args.replay))
+replay_frame = args.replay_frame
+
+#Stream server, if enabled:
+stream = StreamServer(args.stream).start() if args.stream and replay is None else None
+step_count = 0
+
+#Simulation thread, if enabled. The flock is then only changed by the thread:
+sim_thread = None
+if args.threaded and replay is None:
+    #Start with the toggles, so that no step is taken with other controls before the first frame:
+    sim_thread = SimulationThread(flock, speed=args.sim_speed, recorder=recorder, stream=stream,
+                                  controls={toggle_name: gui_toggles[toggle_name].getValue()
+                                            for toggle_name in ('separation', 'alignment', 'cohesion', 'edges', 'paused')}).start()
+
+#Flock render mode:
+render_mode = args.render_mode
+
+#Phase timers:
+profiler = Profiler(enabled=args.profile)
+profile_changed = False
+
 run = True
 while run:
-    clock.tick(sim_var['fps']) #Define clock
-    screen.fill(color['darkgray']) #Define background color
+    profiler.start_frame()
+    clock.tick(args.render_fps if sim_thread is not None else sim_var['fps']) #Define clock
+    profiler.mark('tick wait')
     events = pygame.event.get()
+    redraw_all = False
     for event in events:
         if event.type == pygame.QUIT:
             run = False
-
-    #Reinitialize simulation with more / less triangles if slider value changes:
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            redraw_all = True
+        if event.type == pygame.KEYDOWN and replay is not None:
+            if event.key == pygame.K_LEFT:
+                replay_frame -= sim_var['fps']
+            elif event.key == pygame.K_RIGHT:
+                replay_frame += sim_var['fps']
+            elif event.key == pygame.K_HOME:
+                replay_frame = 0
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+            profiler.set_enabled(not profiler.enabled)
+            profile_changed = True
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+            render_mode = render_modes[(render_modes.index(render_mode) + 1) % len(render_modes)]
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_s and replay is None:
+            #Save checkpoint, by the simulation thread between two steps if enabled:
+            checkpoint_toggles = {toggle_name: toggle.getValue() for toggle_name, toggle in gui_toggles.items()}
+            if sim_thread is None:
+                save_checkpoint(args.checkpoint or 'checkpoint.npz', flock, toggles=checkpoint_toggles)
+            else:
+                sim_thread.save_checkpoint(args.checkpoint or 'checkpoint.npz', toggles=checkpoint_toggles)
+    profiler.mark('events')
+
+    #Restore simulation viewport from background:
+    screen.blit(background, viewport_rect, viewport_rect)
+
+    #Add / remove triangles if slider value changes, the other triangles keep their state:
     if slider_2.getValue() != slider_2_value_old:
-        N = slider_2.getValue()
-        t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, t_colors, case_study_original_color = initialize_boids(N)
+        N = int(slider_2.getValue())
+        if sim_thread is None:
+            flock.resize(N)
+        else:
+            sim_thread.resize(N)
         slider_2_value_old = slider_2.getValue()
-    
-    
-    #Draw box enclosure for simulation:
-    pygame.draw.rect(screen, color['lightgray'], 
-                     (sim_var['bounding box scale']*sim_var['width'], 
-                      sim_var['bounding box scale']*sim_var['height'], 
-                      (1-2*sim_var['bounding box scale'])*sim_var['width'], 
-                      (1-2*sim_var['bounding box scale'])*sim_var['height']), 
-                     width=3)
-                     
-    #Draw buffer box enclosure for loop around:
-    pygame.draw.rect(screen, color['white'], 
-                     ((sim_var['bounding box scale'] - sim_var['loop around buffer'])*sim_var['width'], 
-                      (sim_var['bounding box scale'] - sim_var['loop around buffer'])*sim_var['height'], 
-                      (1-2*(sim_var['bounding box scale'] - sim_var['loop around buffer']))*sim_var['width'], 
-                      (1-2*(sim_var['bounding box scale'] - sim_var['loop around buffer']))*sim_var['height']), 
-                     width=3)
+    profiler.mark('clear')
 
     #Case study Toggle:
     if toggle_4.getValue() == False:
-        t_colors[0] = case_study_original_color
         #If case study not enabled, disable nearest boid toggle:
         toggle_5.startOn = False
         toggle_5.disable()
 
     else:
-        t_colors[0] = 'red' #case study selected
         #Togle is enabled for nearest:
         toggle_5.enable()
 
 
-    
-    #Find Closest triangle to case study:
-    distance = np.sqrt((t_x0_i[0]*sim_var['width'] - t_x0_i*sim_var['width'])**2 + 
-                       (t_y0_i[0]*sim_var['height'] - t_y0_i*sim_var['height'])**2)
-
-    if N > 1:
-        closest_index = np.argsort(distance)[1]
-    else:
-        closest_index = 0
+    if replay is not None:
+        #Read the replayed frame, the replay loops back to the first frame at the end:
+        replay_frame %= len(replay)
+        t_x0_i, t_y0_i, t_angle_i, t_colors = replay.frame(replay_frame)
+        closest = 0
+        if toggle_5.getValue() == True and toggle_4.getValue() == True and len(t_x0_i) > 1:
+            closest = SpatialGrid(t_x0_i, t_y0_i, scale=(1.0, sim_var['height']/sim_var['width'])).query_nearest(index=np.zeros(1, dtype=int))[0]
+        if toggle_3.getValue() == False:
+            replay_frame += 1
+        profiler.mark('replay')
 
-    old_closest_color = t_colors[closest_index]
-    if toggle_5.getValue() == True and toggle_4.getValue() == True:
-        t_colors[closest_index] = 'darkgreen' #change triangle color
-    
-    #Loop over all triangles drawn for each frame:
-    for ii in range(slider_2.getValue()):
-        #Draw Triangle:
-        draw_triangle(t_x0_rel=t_x0_i[ii], t_y0_rel=t_y0_i[ii], t_angle=t_angle_i[ii], t_color=color[t_colors[ii]])
-    
+    elif sim_thread is None:
         #Loop around edges:
         if toggle_6.getValue() == True:
-            t_x0_i[ii], t_y0_i[ii] = loop_around_edges(t_x0=t_x0_i[ii], t_y0=t_y0_i[ii])
-
-    #restore triangle color after being drawn:
-    t_colors[closest_index] = old_closest_color
+            flock.loop_around_edges()
+        profiler.mark('edges')
 
-
-    #Take a step for triangles:
-    #3 options: no change, counter clockwise step, clockwise step
-    for ii in range(N):
-        #Find closest triangle index:
-        distance = np.sqrt((t_x0_i[ii]*sim_var['width'] - t_x0_i*sim_var['width'])**2 + 
-                           (t_y0_i[ii]*sim_var['height'] - t_y0_i*sim_var['height'])**2)
-        if N > 1:
-            closest_index = np.argsort(distance)[1]
+        #Find closest triangles, the search is done once per frame for case study and steering:
+        period = edge_period(toggle_6.getValue())
+        if period is not None:
+            closest_index = find_closest(flock.t_x0_i, flock.t_y0_i, period=period)
         else:
-            closest_index = 0
-        
-        #Update angle to steer away or towards closest triangle:
-        d_angle = sim_var['collision strength']
-        
-        t_x0_i_test_0 = t_x0_i[ii] + 1/sim_var['fps'] * t_vx0_i[ii]
-        t_y0_i_test_0 = t_y0_i[ii] + 1/sim_var['fps'] * t_vy0_i[ii]
-        distance_test_0 = np.sqrt((t_x0_i_test_0 - t_x0_i[closest_index])**2 + 
-                                  (t_y0_i_test_0 - t_y0_i[closest_index])**2)
-        t_x0_i_test_1 = t_x0_i[ii] + 1/sim_var['fps'] * (sim_var['t_speed'] * np.cos(t_angle_i[ii] + d_angle))
-        t_y0_i_test_1 = t_y0_i[ii] + 1/sim_var['fps'] * (sim_var['t_speed'] * np.sin(t_angle_i[ii] + d_angle))
-        distance_test_1 = np.sqrt((t_x0_i_test_1 - t_x0_i[closest_index])**2 + 
-                                  (t_y0_i_test_1 - t_y0_i[closest_index])**2)
-        t_x0_i_test_2 = t_x0_i[ii] + 1/sim_var['fps'] * (sim_var['t_speed'] * np.cos(t_angle_i[ii] - d_angle))
-        t_y0_i_test_2 = t_y0_i[ii] + 1/sim_var['fps'] * (sim_var['t_speed'] * np.sin(t_angle_i[ii] - d_angle))
-        distance_test_2 = np.sqrt((t_x0_i_test_2 - t_x0_i[closest_index])**2 + 
-                                  (t_y0_i_test_2 - t_y0_i[closest_index])**2)
-        distance_test = np.array([distance_test_0, distance_test_1, distance_test_2])
-        angle_test = np.array([t_angle_i[ii], t_angle_i[ii] + d_angle, t_angle_i[ii] - d_angle])
-
-
-        #Separation:
-        if toggle_7.getValue() == True and toggle_9.getValue() == True:        
-            #If below coherence scale: repel each other, if above it then atrack each other:
-            if distance_test_0 <= sim_var['cohesion scale']:
-                new_angle = angle_test[np.argmax(distance_test)]
-            elif distance_test_0 > sim_var['cohesion scale']:
-                new_angle = angle_test[np.argmin(distance_test)]
-        
-        elif toggle_7.getValue() == True and toggle_9.getValue() == False:        
-            new_angle = angle_test[np.argmax(distance_test)]
-        
-        elif toggle_7.getValue() == False and toggle_9.getValue() == True:        
-            if distance_test_0 > sim_var['cohesion scale']:
-                new_angle = angle_test[np.argmin(distance_test)]
-        
-        elif toggle_7.getValue() == False and toggle_9.getValue() == False:
-            new_angle = angle_test[0] #No change
-            
-        
-        #Play / Pause Toggle:
-        if toggle_3.getValue() == False:
-            t_angle_i[ii] = new_angle
-
+            grid = SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=(1.0, sim_var['height']/sim_var['width']))
+            closest_index = grid.query_nearest()
+        profiler.mark('neighbours')
+        t_x0_i, t_y0_i, t_angle_i, t_colors, closest = flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_colors, closest_index[0]
 
-        
-        #Update and steer in nearest triangle direction:
-        d_angle_align = sim_var['alignment strength']
-        angle_closest = t_angle_i[closest_index]
-        diff_angle = angle_closest - t_angle_i[ii]
-        
-        #Play / Pause Toggle:
-        if toggle_3.getValue() == False:
-            #alignmnet:
-            if toggle_8.getValue() == True:
-                t_angle_i[ii] += d_angle_align * np.sign(diff_angle)
-                
+    else:
+        #Send toggles to the simulation thread and interpolate its latest steps:
+        sim_thread.set_controls(separation=toggle_7.getValue(), alignment=toggle_8.getValue(), cohesion=toggle_9.getValue(),
+                                edges=toggle_6.getValue(), paused=toggle_3.getValue())
+        t_x0_i, t_y0_i, t_angle_i, t_colors, closest = sim_thread.interpolate()
+        profiler.mark('interpolate')
+
+    #Case study and closest triangle to case study:
+    old_case_study_color, old_closest_color = t_colors[0], t_colors[closest]
+    if toggle_4.getValue() == True:
+        t_colors[0] = palette.index('red') #case study selected
+    if toggle_5.getValue() == True and toggle_4.getValue() == True:
+        t_colors[closest] = palette.index('darkgreen') #change triangle color
     
-    #Play / Pause Toggle:
-    if toggle_3.getValue() == False:
-        #Update Triangle position (Can do array operations):
-        t_x0_i += 1/sim_var['fps'] * t_vx0_i
-        t_y0_i += 1/sim_var['fps'] * t_vy0_i
-
-        #update triangle speed direction (Can do array operations):
-        #t_angle_i += np.random.uniform(low=-0.1, high=0.1, size=N)
-        t_vx0_i = sim_var['t_speed'] * np.cos(t_angle_i)
-        t_vy0_i = sim_var['t_speed'] * np.sin(t_angle_i)
-
-
-    #Define simulation controls:
-    #Draw control box
-    pygame.draw.rect(screen, color['white'], 
-                     ((1)*sim_var['width'], 
-                     (sim_var['loop around buffer'])*sim_var['height'], 
-                     (sim_var['controls box scale'] - sim_var['loop around buffer'])*sim_var['width'], 
-                     (1 - 2*sim_var['loop around buffer'])*sim_var['height']), 
-                     width=3)
-
-    #Add text in control box:
-    screen.blit(text_1, textRect_1)
-    screen.blit(text_2, textRect_2)
-    screen.blit(text_3, textRect_3)
-    screen.blit(text_4, textRect_4)
-    screen.blit(text_5, textRect_5)
-    screen.blit(text_6, textRect_6)
-    screen.blit(text_7, textRect_7)
-    screen.blit(text_8, textRect_8)
-    screen.blit(text_9, textRect_9)
-
-
+    #Draw the flock for each frame, clipped to the simulation viewport. Case study and closest triangles are
+    #drawn on top of points and heatmaps:
+    screen.set_clip(viewport_rect)
+    if draw_flock(screen, viewport_rect, t_x0_i, t_y0_i, t_angle_i, t_colors, mode=render_mode, sprites=sprite_cache) != 'triangles' and toggle_4.getValue() == True:
+        highlighted = [0, closest] if toggle_5.getValue() == True else [0]
+        draw_boids(screen, t_x0_i[highlighted], t_y0_i[highlighted], t_angle_i[highlighted], t_colors[highlighted])
+    screen.set_clip(None)
+
+    #restore triangle colors after being drawn:
+    t_colors[closest] = old_closest_color
+    t_colors[0] = old_case_study_color
+    profiler.mark('draw')
+
+    #Record, stream and take a step for triangles:
+    if replay is None and sim_thread is None:
+        if recorder is not None and toggle_3.getValue() == False:
+            recorder.write(flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_colors)
+            profiler.mark('recording')
+        if stream is not None:
+            stream.publish(step_count, flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_colors)
+            profiler.mark('streaming')
+        if toggle_3.getValue() == False:
+            step_count += 1
+            flock.steer(closest_index,
+                        separation=toggle_7.getValue(), 
+                        alignment=toggle_8.getValue(), 
+                        cohesion=toggle_9.getValue(),
+                        period=period)
+            profiler.mark('steering')
+            flock.integrate()
+            profiler.mark('integration')
+
+
+    #Redraw the control box only if widgets may have changed:
+    widgets_value = [widget.getValue() for widget in widgets]
+    panel_changed = redraw_all or widgets_value != widgets_value_old or any(
+        event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and panel_rect.collidepoint(event.pos)
+        for event in events)
+    widgets_value_old = widgets_value
+    if panel_changed:
+        screen.blit(background, panel_rect, panel_rect)
     pygame_widgets.update(events)
-    pygame.display.update()
-
+    profiler.mark('widgets')
+
+    #Profiling overlay, refreshed twice per second:
+    profile_drawn = profile_changed or panel_changed or (profiler.enabled and profiler.frame % max(sim_var['fps'] // 2, 1) == 0)
+    if profile_drawn:
+        screen.blit(background, profile_rect, profile_rect)
+        if profiler.enabled:
+            draw_profile(screen, profile_rect, profiler.summary(), font_3)
+        profile_changed = False
+
+    if redraw_all:
+        pygame.display.update()
+    elif panel_changed:
+        pygame.display.update([viewport_rect, panel_rect])
+    elif profile_drawn:
+        pygame.display.update([viewport_rect, profile_rect])
+    else:
+        pygame.display.update(viewport_rect)
+    profiler.mark('display')
+
+if sim_thread is not None:
+    sim_thread.close()
+if recorder is not None:
+    recorder.close()
+if stream is not None:
+    stream.close()
+if args.profile_output:
+    profiler.export(args.profile_output)
 pygame.quit()
 #----------------------------------------------
-
-
-
-
@@ -0,0 +1,216 @@
+#-----------------------------------------------------
+#BOIDS PARALLEL SIMULATION CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+from Boids_Sim import sim_var, SpatialGrid, steer_boids
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Flock arrays kept in shared memory, and their dtype. None is the float type of the flock:
+shared_arrays = {'t_x0_i': None,
+                 't_y0_i': None,
+                 't_angle_i': None,
+                 't_vx0_i': None,
+                 't_vy0_i': None,
+                 'new_angle': None,
+                 'closest_index': np.int64}
+
+#Shared memory views of the worker processes:
+worker_shared = {}
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define worker initialization:
+def attach_worker(names, capacity, dtype=np.float64):
+    '''
+    Description:
+        Attach a worker process to the shared memory blocks of the flock arrays.
+    Input:
+        names: shared memory block name of each flock array. dtype: dict
+        capacity: length of the shared arrays. dtype: int
+        dtype: float type of the flock arrays. dtype: numpy dtype
+    '''
+    for key, name in names.items():
+        block = shared_memory.SharedMemory(name=name)
+        worker_shared[key] = (block, np.ndarray(capacity, dtype=shared_arrays[key] or dtype, buffer=block.buf))
+    return
+
+
+#Define tile steering:
+def steer_tile(task):
+    '''
+    Description:
+        Find the closest boid and steer the boids of one tile, in place in shared memory. The closest
+        boids are searched among the boids of the tile and of its halo. Boids with no boid closer than
+        the halo width may have a closer boid further away, and are searched over the whole flock.
+    Input:
+        task: number of boids, tile bounds (x low, x high, y low, y high), halo width, toggles, simulation
+              variables and shared arrays of the headings and new headings. dtype: tuple
+    Output:
+        N_tile: number of boids steered. dtype: int
+    '''
+    N, (x_low, x_high, y_low, y_high), halo, toggles, sim_var_values, heading_keys = task
+    sim_var.update(sim_var_values)
+    t_x0_i, t_y0_i, t_vx0_i, t_vy0_i, closest_shared = [
+        worker_shared[key][1][:N] for key in ('t_x0_i', 't_y0_i', 't_vx0_i', 't_vy0_i', 'closest_index')]
+    t_angle_i, new_angle = [worker_shared[key][1][:N] for key in heading_keys]
+
+    own = np.flatnonzero((t_x0_i >= x_low) & (t_x0_i < x_high) & (t_y0_i >= y_low) & (t_y0_i < y_high))
+    if len(own) == 0:
+        return 0
+    near = np.flatnonzero((t_x0_i >= x_low - halo) & (t_x0_i < x_high + halo) &
+                          (t_y0_i >= y_low - halo) & (t_y0_i < y_high + halo))
+
+    #Closest boid within tile and halo:
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    grid = SpatialGrid(t_x0_i[near], t_y0_i[near], scale=scale)
+    closest_index = near[grid.query_nearest(index=np.searchsorted(near, own))]
+
+    #Boids outside of the halo are at least the halo width away:
+    distance2 = ((t_x0_i[own] - t_x0_i[closest_index]) * scale[0])**2 + ((t_y0_i[own] - t_y0_i[closest_index]) * scale[1])**2
+    unsafe = np.flatnonzero((distance2 > (halo * min(scale))**2) | (closest_index == own))
+    if len(unsafe) > 0 and N > 1:
+        closest_index[unsafe] = SpatialGrid(t_x0_i, t_y0_i, scale=scale).query_nearest(index=own[unsafe])
+
+    new_angle[own] = steer_boids(t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, closest_index, index=own, **toggles)
+    closest_shared[own] = closest_index
+    return len(own)
+
+
+#Define parallel engine:
+class ParallelEngine:
+    '''
+    Description:
+        Multi-core flock steering by spatial domain decomposition. The flock arrays are kept in shared
+        memory and the [0, 1] x [0, 1] domain is split in tiles; border tiles extend to boids outside of it.
+        A process pool finds the closest boids and steers each tile in place. Results match steer_boids
+        over the whole flock.
+    Input:
+        capacity: maximum number of boids. dtype: int
+        processes: number of worker processes. Default: number of cores. dtype: int
+        tiles: number of tiles along x and y. Default: about two tiles per process. dtype: tuple
+        halo: halo width around tiles, in relative units. Default: twice the cohesion scale. dtype: float
+        dtype: float type of the flock arrays. dtype: numpy dtype
+    '''
+    def __init__(self, capacity, processes=None, tiles=None, halo=None, dtype=np.float64):
+        self.capacity = max(int(capacity), 1)
+        self.processes = processes or multiprocessing.cpu_count()
+        if tiles is None:
+            tiles_x = int(np.ceil(np.sqrt(2 * self.processes)))
+            tiles = (tiles_x, int(np.ceil(2 * self.processes / tiles_x)))
+        self.tiles = tiles
+        self.halo = 2 * sim_var['cohesion scale'] if halo is None else halo
+        self.dtype = np.dtype(dtype)
+
+        self.blocks = {}
+        self.arrays = {}
+        for key, dtype in shared_arrays.items():
+            dtype = np.dtype(dtype or self.dtype)
+            block = shared_memory.SharedMemory(create=True, size=self.capacity * dtype.itemsize)
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(self.capacity, dtype=dtype, buffer=block.buf)
+        self.pool = multiprocessing.Pool(self.processes, initializer=attach_worker,
+                                         initargs=({key: block.name for key, block in self.blocks.items()}, self.capacity,
+                                                   self.dtype))
+
+
+    def tile_bounds(self):
+        '''
+        Description:
+            Bounds of each tile. Outer bounds of the border tiles are infinite.
+        Output:
+            bounds: (x low, x high, y low, y high) of each tile. dtype: list of tuple
+        '''
+        x_edges = np.linspace(0, 1, self.tiles[0] + 1)
+        y_edges = np.linspace(0, 1, self.tiles[1] + 1)
+        x_edges[0], x_edges[-1] = -np.inf, np.inf
+        y_edges[0], y_edges[-1] = -np.inf, np.inf
+        return [(x_edges[ii], x_edges[ii + 1], y_edges[jj], y_edges[jj + 1])
+                for ii in range(self.tiles[0]) for jj in range(self.tiles[1])]
+
+
+    def allocate(self, key, capacity, dtype):
+        '''
+        Description:
+            Allocator of the flock buffers for Flock.reserve: shared memory views for the flock arrays kept
+            in shared memory, so that steer does not copy them, private buffers otherwise. The flock must be
+            moved out of shared memory before close.
+        Input:
+            key: name of the flock array. dtype: str
+            capacity: number of boids the buffer holds. dtype: int
+            dtype: type of the buffer. dtype: numpy dtype
+        Output:
+            buffer: uninitialized buffer. dtype: 1D array
+        '''
+        if key in self.arrays and capacity <= self.capacity and self.arrays[key].dtype == dtype:
+            return self.arrays[key][:capacity]
+        return np.empty(capacity, dtype=dtype)
+
+
+    def steer(self, t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, separation=True, alignment=True, cohesion=True):
+        '''
+        Description:
+            Find the closest boid and the new heading of every boid with the process pool.
+        Input:
+            t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+            t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+            t_vx0_i, t_vy0_i: boids velocities. dtype: 1D array
+            separation, alignment, cohesion: flocking rules toggles. dtype: bool
+        Output:
+            closest_index: index of the closest boid of each boid. Shared memory view. dtype: 1D int array
+            new_angle: boids new orientation angle. Shared memory view. unit: rad. dtype: 1D array
+        '''
+        N = len(t_x0_i)
+        if N > self.capacity:
+            raise ValueError('Flock of {} boids exceeds the parallel engine capacity of {}.'.format(N, self.capacity))
+
+        #Flock.integrate swaps the heading buffers, the shared arrays of the headings are swapped with them:
+        heading_keys = ('t_angle_i', 'new_angle')
+        if np.shares_memory(t_angle_i, self.arrays['new_angle']):
+            heading_keys = ('new_angle', 't_angle_i')
+
+        #Copy flock in shared memory unless already there, see allocate:
+        for key, array in zip(['t_x0_i', 't_y0_i', heading_keys[0], 't_vx0_i', 't_vy0_i'], [t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i]):
+            if not np.shares_memory(array, self.arrays[key]):
+                self.arrays[key][:N] = array
+
+        toggles = {'separation': separation, 'alignment': alignment, 'cohesion': cohesion}
+        self.pool.map(steer_tile, [(N, bounds, self.halo, toggles, dict(sim_var), heading_keys) for bounds in self.tile_bounds()])
+        return self.arrays['closest_index'][:N], self.arrays[heading_keys[1]][:N]
+
+
+    def close(self):
+        '''
+        Description:
+            Stop the process pool and release the shared memory.
+        '''
+        self.pool.close()
+        self.pool.join()
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+        return
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+#----------------------------------------------
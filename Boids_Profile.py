@@ -0,0 +1,167 @@
+#-----------------------------------------------------
+#BOIDS PROFILING CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import json
+import time
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define phase profiler:
+class Profiler:
+    '''
+    Description:
+        Frame phase timers. A phase ends at each call of mark and started at the previous mark, or at the
+        start of the frame. Phase times are kept over the last frames for rolling statistics, and as trace
+        events for export. When disabled, start_frame and mark return at once.
+    Input:
+        enabled: profiling switched on. dtype: bool
+        window: number of frames of the rolling statistics. dtype: int
+        trace_capacity: number of trace events kept, the oldest are dropped. dtype: int
+        max_phases: maximum number of phase names. dtype: int
+    '''
+    def __init__(self, enabled=False, window=120, trace_capacity=100000, max_phases=32):
+        self.enabled = enabled
+        self.window = window
+        self.trace_capacity = trace_capacity
+        self.time_zero = time.perf_counter()
+        self.time_last = self.time_zero
+        self.frame = -1
+
+        #Rolling phase times, one row per phase, and total frame times:
+        self.phases = {}
+        self.phase_times = np.zeros((max_phases, window))
+        self.phase_count = np.zeros(max_phases, dtype=np.int64)
+        self.frame_times = np.zeros(window)
+        self.frame_count = 0
+        self.frame_start = None
+
+        #Trace events ring buffer:
+        self.trace_phase = np.zeros(trace_capacity, dtype=np.int16)
+        self.trace_frame = np.zeros(trace_capacity, dtype=np.int64)
+        self.trace_start = np.zeros(trace_capacity)
+        self.trace_duration = np.zeros(trace_capacity)
+        self.trace_count = 0
+
+
+    def set_enabled(self, enabled):
+        '''
+        Description:
+            Switch profiling on or off. Timers restart at the next frame.
+        Input:
+            enabled: profiling switched on. dtype: bool
+        '''
+        self.enabled = enabled
+        self.frame_start = None
+        return
+
+
+    def start_frame(self):
+        '''
+        Description:
+            Start the timers of a new frame, and record the total time of the previous frame.
+        '''
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times[self.frame_count % self.window] = now - self.frame_start
+            self.frame_count += 1
+        self.frame += 1
+        self.frame_start = now
+        self.time_last = now
+        return
+
+
+    def mark(self, phase):
+        '''
+        Description:
+            End a phase of the current frame, started at the previous mark or at the start of the frame.
+        Input:
+            phase: phase name. dtype: str
+        '''
+        if not self.enabled or self.frame_start is None:
+            return
+        now = time.perf_counter()
+        index = self.phases.get(phase)
+        if index is None:
+            index = self.phases[phase] = len(self.phases)
+        duration = now - self.time_last
+        self.phase_times[index, self.phase_count[index] % self.window] = duration
+        self.phase_count[index] += 1
+
+        event = self.trace_count % self.trace_capacity
+        self.trace_phase[event] = index
+        self.trace_frame[event] = self.frame
+        self.trace_start[event] = self.time_last - self.time_zero
+        self.trace_duration[event] = duration
+        self.trace_count += 1
+        self.time_last = now
+        return
+
+
+    def summary(self):
+        '''
+        Description:
+            Rolling statistics of the phase and frame times over the last frames.
+        Output:
+            summary: mean, median, 95th and 99th percentile of each phase, and of the frame as 'frame'.
+                     unit: ms. dtype: dict of dict
+        '''
+        summary = {}
+        rows = [(phase, self.phase_times[index, :min(self.phase_count[index], self.window)]) for phase, index in self.phases.items()]
+        rows.append(('frame', self.frame_times[:min(self.frame_count, self.window)]))
+        for phase, times in rows:
+            if len(times) == 0:
+                continue
+            percentiles = 1e3 * np.percentile(times, [50, 95, 99])
+            summary[phase] = {'mean ms': 1e3 * float(np.mean(times)), 'p50 ms': float(percentiles[0]),
+                              'p95 ms': float(percentiles[1]), 'p99 ms': float(percentiles[2])}
+        return summary
+
+
+    def events(self):
+        '''
+        Description:
+            Trace events kept, oldest first.
+        Output:
+            phase, frame, start, duration: phase name, frame number, start time and duration of each event.
+                                           unit: s. dtype: list, 1D arrays
+        '''
+        count = min(self.trace_count, self.trace_capacity)
+        order = (np.arange(count) + self.trace_count - count) % self.trace_capacity
+        names = list(self.phases)
+        return ([names[index] for index in self.trace_phase[order]], self.trace_frame[order],
+                self.trace_start[order], self.trace_duration[order])
+
+
+    def export(self, path):
+        '''
+        Description:
+            Write the trace events to a CSV file, or to a Chrome trace event JSON file if path ends with
+            .json. Chrome traces can be opened in chrome://tracing or Perfetto.
+        Input:
+            path: output file path. dtype: str
+        '''
+        phase, frame, start, duration = self.events()
+        if path.endswith('.json'):
+            trace = [{'name': name, 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': 1e6 * float(event_start),
+                      'dur': 1e6 * float(event_duration), 'args': {'frame': int(event_frame)}}
+                     for name, event_frame, event_start, event_duration in zip(phase, frame, start, duration)]
+            with open(path, 'w') as file:
+                json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, file)
+            return
+        with open(path, 'w') as file:
+            file.write('frame,phase,start ms,duration ms\n')
+            for name, event_frame, event_start, event_duration in zip(phase, frame, start, duration):
+                file.write('{},{},{:.4f},{:.4f}\n'.format(event_frame, name, 1e3 * event_start, 1e3 * event_duration))
+        return
+#----------------------------------------------
@@ -0,0 +1,210 @@
+#-----------------------------------------------------
+#BOIDS RECORDING CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import json
+import os
+from Boids_Sim import sim_var, palette
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Flock arrays recorded at each frame:
+record_arrays = ('t_x0_i', 't_y0_i', 't_angle_i', 't_colors')
+
+#Index file of a recording:
+index_name = 'index.json'
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define chunk file name:
+def chunk_file(directory, chunk, key):
+    '''
+    Description:
+        Path of the .npy file of a flock array in a chunk of a recording.
+    Input:
+        directory: recording directory. dtype: str
+        chunk: chunk number. dtype: int
+        key: flock array name. dtype: str
+    Output:
+        path: chunk file path. dtype: str
+    '''
+    return os.path.join(directory, 'chunk_{:06d}_{}.npy'.format(chunk, key))
+
+
+#Define trajectory recorder:
+class Recorder:
+    '''
+    Description:
+        Record the flock positions, headings and palette indices of each frame. Frames are written in
+        chunks of memory-mapped .npy files of shape (frames, N), one file per array, and listed in a
+        small JSON index. A new chunk starts when a chunk is full or the number of boids changes.
+        The index is written when a chunk opens and every index_frames frames, so that a recording
+        stopped by a crash can be replayed up to its last index.
+    Input:
+        directory: recording directory, created if needed. dtype: str
+        chunk_frames: number of frames per chunk. dtype: int
+        dtype: float type of the recorded positions and headings. dtype: numpy dtype
+        index_frames: number of frames between two updates of the index. Default: fps. dtype: int
+    '''
+    def __init__(self, directory, chunk_frames=256, dtype=np.float32, index_frames=None):
+        self.directory = directory
+        self.chunk_frames = chunk_frames
+        self.index_frames = sim_var['fps'] if index_frames is None else index_frames
+        self.dtype = np.dtype(dtype)
+        self.frames = 0
+        self.chunks = []
+        self.arrays = None
+        os.makedirs(directory, exist_ok=True)
+
+
+    def open_chunk(self, N):
+        '''
+        Description:
+            Close the current chunk, create the files of a new chunk and list it in the index.
+        Input:
+            N: number of boids of the chunk frames. dtype: int
+        '''
+        self.close_chunk()
+        chunk = len(self.chunks)
+        self.chunks.append({'chunk': chunk, 'first frame': self.frames, 'frames': 0, 'N': N})
+        self.arrays = {key: np.lib.format.open_memmap(chunk_file(self.directory, chunk, key), mode='w+',
+                                                      dtype=np.uint8 if key == 't_colors' else self.dtype,
+                                                      shape=(self.chunk_frames, N))
+                       for key in record_arrays}
+        self.write_index()
+        return
+
+
+    def close_chunk(self):
+        '''
+        Description:
+            Flush the current chunk files and update the index.
+        '''
+        if self.arrays is None:
+            return
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = None
+        self.write_index()
+        return
+
+
+    def write(self, t_x0_i, t_y0_i, t_angle_i, t_colors):
+        '''
+        Description:
+            Record one frame of the flock.
+        Input:
+            t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+            t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+            t_colors: boids colors, indices in the palette. dtype: 1D uint8 array
+        '''
+        N = len(t_x0_i)
+        if self.arrays is None or self.chunks[-1]['N'] != N or self.chunks[-1]['frames'] == self.chunk_frames:
+            self.open_chunk(N)
+        chunk = self.chunks[-1]
+        for key, array in zip(record_arrays, (t_x0_i, t_y0_i, t_angle_i, t_colors)):
+            self.arrays[key][chunk['frames']] = array
+        chunk['frames'] += 1
+        self.frames += 1
+        if self.frames % self.index_frames == 0:
+            for array in self.arrays.values():
+                array.flush()
+            self.write_index()
+        return
+
+
+    def write_index(self):
+        '''
+        Description:
+            Write the JSON index of the recording: chunks, number of frames and simulation variables.
+            The index is replaced at once, a crash while writing leaves the previous index.
+        '''
+        index = {'frames': self.frames,
+                 'chunk frames': self.chunk_frames,
+                 'dtype': self.dtype.name,
+                 'arrays': list(record_arrays),
+                 'palette': palette,
+                 'sim_var': sim_var,
+                 'chunks': self.chunks}
+        path = os.path.join(self.directory, index_name)
+        with open(path + '.tmp', 'w') as file:
+            json.dump(index, file, indent=1)
+        os.replace(path + '.tmp', path)
+        return
+
+
+    def close(self):
+        '''
+        Description:
+            Flush the last chunk and write the index.
+        '''
+        self.close_chunk()
+        self.write_index()
+        return
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+#Define trajectory replay:
+class Replay:
+    '''
+    Description:
+        Read the frames of a recording. Chunk files are memory-mapped when a frame of the chunk is first
+        read, so seeking to any frame only reads that frame from disk.
+    Input:
+        directory: recording directory. dtype: str
+    '''
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, index_name)) as file:
+            self.index = json.load(file)
+        self.chunks = self.index['chunks']
+        self.first_frames = np.array([chunk['first frame'] for chunk in self.chunks], dtype=np.int64)
+        self.chunk = None
+        self.arrays = None
+
+
+    def __len__(self):
+        return self.index['frames']
+
+
+    def frame(self, frame):
+        '''
+        Description:
+            Flock arrays of a frame. The arrays are copy-on-write views of the chunk files: they can be
+            changed, e.g. to highlight boids, without changing the recording.
+        Input:
+            frame: frame number, negative numbers count from the end. dtype: int
+        Output:
+            t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+            t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+            t_colors: boids colors, indices in the palette. dtype: 1D uint8 array
+        '''
+        if frame < 0:
+            frame += len(self)
+        if not 0 <= frame < len(self):
+            raise IndexError('Frame {} out of recording of {} frames.'.format(frame, len(self)))
+        chunk = int(np.searchsorted(self.first_frames, frame, side='right')) - 1
+        if chunk != self.chunk:
+            self.arrays = {key: np.load(chunk_file(self.directory, chunk, key), mmap_mode='c') for key in record_arrays}
+            self.chunk = chunk
+        row = frame - self.chunks[chunk]['first frame']
+        return tuple(self.arrays[key][row] for key in record_arrays)
+#----------------------------------------------
@@ -0,0 +1,308 @@
+#-----------------------------------------------------
+#BOIDS RENDER CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import pygame
+import numpy as np
+from Boids_Sim import sim_var, palette
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#define colors dictionary:
+color = {'red':(204, 0, 0),
+         'darkred':(153, 0, 0),
+         'darkdarkred':(102, 0, 0),
+         'darkgray':(32, 32, 32),
+         'white':(255, 255, 255),
+         'lightgray':(128, 128, 128),
+         'lightblue':(153, 204, 255),
+         'blue':(51, 153, 255),
+         'darkblue':(0, 102, 204),
+         'darkgreen':(0, 204, 102)}
+
+#RGB colors of the boids palette indices:
+palette_color = [color[name] for name in palette]
+
+#Flock render modes, 'auto' draws triangles up to sim_var['point render threshold'] boids and points above:
+render_modes = ('auto', 'triangles', 'points', 'density', 'heading')
+
+#Density heatmap color stops, from empty to most crowded cells:
+density_stops = np.array([color['darkgray'], color['darkblue'], color['blue'], color['lightblue'], color['white']], dtype=float)
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define Triangle vertices function:
+def triangle_vertices(t_x0_i, t_y0_i, t_angle_i):
+    '''
+    Description:
+        Compute the vertices of the triangles of the whole flock at once.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of triangles. dtype: float or 1D array
+        t_angle_i: Orientation angle of triangles. Units: rad. dtype: float or 1D array
+    Output:
+        vertices: triangle vertices in pixels. Shape: (N, 3, 2), or (3, 2) for a single triangle. dtype: array
+    '''
+    t_x0 = np.asarray(t_x0_i)*sim_var['width']
+    t_y0 = np.asarray(t_y0_i)*sim_var['height']
+    t_width = sim_var['t_size']*sim_var['width']
+    t_height = 1.5 * t_width
+    cos_angle = np.cos(t_angle_i)
+    sin_angle = np.sin(t_angle_i)
+
+    vertices = np.empty(t_x0.shape + (3, 2))
+    t_x4 = t_x0 - 0.3 * t_height * cos_angle
+    t_y4 = t_y0 - 0.3 * t_height * sin_angle
+    vertices[..., 0, 0] = t_x4 - 0.5 * t_width * sin_angle
+    vertices[..., 0, 1] = t_y4 + 0.5 * t_width * cos_angle
+    vertices[..., 1, 0] = t_x4 + 0.5 * t_width * sin_angle
+    vertices[..., 1, 1] = t_y4 - 0.5 * t_width * cos_angle
+    vertices[..., 2, 0] = t_x0 + 0.7 * t_height * cos_angle
+    vertices[..., 2, 1] = t_y0 + 0.7 * t_height * sin_angle
+    return vertices
+
+
+#Define sprite cache:
+class SpriteCache:
+    '''
+    Description:
+        Triangles pre-rendered at K quantized orientation angles for each color. Drawing a boid is then
+        a single blit of the cached surface closest to its angle.
+    Input:
+        K: number of quantized angles over a full turn. dtype: int
+    '''
+    def __init__(self, K=64):
+        self.K = K
+        t_width = sim_var['t_size']*sim_var['width']
+        self.half_size = int(np.ceil(0.7 * 1.5 * t_width)) + 1
+        self.sprites = {}
+
+
+    def get(self, t_color):
+        '''
+        Description:
+            Surfaces of the triangle at the K angles for a given color, rendered on first use.
+        Input:
+            t_color: RGB color of triangle. format: (R, G, B). dtype: tuple
+        Output:
+            sprites: pre-rendered triangles, sprites[k] is oriented at angle 2*pi*k/K. dtype: list
+        '''
+        if t_color not in self.sprites:
+            center = self.half_size / sim_var['width'], self.half_size / sim_var['height']
+            vertices = triangle_vertices(np.full(self.K, center[0]), np.full(self.K, center[1]),
+                                         2 * np.pi * np.arange(self.K) / self.K)
+            sprites = []
+            for k in range(self.K):
+                sprite = pygame.Surface((2 * self.half_size, 2 * self.half_size), pygame.SRCALPHA)
+                pygame.draw.polygon(sprite, t_color, vertices[k].tolist())
+                if pygame.display.get_surface() is not None:
+                    sprite = sprite.convert_alpha() #Match display pixel format for faster blits
+                sprites.append(sprite)
+            self.sprites[t_color] = sprites
+        return self.sprites[t_color]
+
+
+    def draw(self, screen, t_x0_i, t_y0_i, t_angle_i, t_colors):
+        '''
+        Description:
+            Blit the triangles of the whole flock with a single Surface.blits call.
+        Input:
+            screen: pygame surface to draw on. dtype: pygame.Surface
+            t_x0_i, t_y0_i: relative center coordinates of triangles. dtype: 1D array
+            t_angle_i: Orientation angle of triangles. Units: rad. dtype: 1D array
+            t_colors: RGB color of each triangle. element format: (R, G, B). dtype: list
+        '''
+        angle_index = np.round(np.asarray(t_angle_i) * self.K / (2 * np.pi)).astype(int) % self.K
+        t_x0 = np.rint(np.asarray(t_x0_i)*sim_var['width']).astype(int) - self.half_size
+        t_y0 = np.rint(np.asarray(t_y0_i)*sim_var['height']).astype(int) - self.half_size
+        screen.blits([(self.get(t_color)[k], (x, y))
+                      for t_color, k, x, y in zip(t_colors, angle_index.tolist(), t_x0.tolist(), t_y0.tolist())],
+                     doreturn=False)
+        return
+
+
+#Define flock drawing function:
+def draw_boids(screen, t_x0_i, t_y0_i, t_angle_i, t_colors, sprites=None):
+    '''
+    Description:
+        Draw the triangles of the whole flock. Vertices are computed for all triangles at once, or
+        triangles are blitted from a sprite cache if given.
+    Input:
+        screen: pygame surface to draw on. dtype: pygame.Surface
+        t_x0_i, t_y0_i: relative center coordinates of triangles. dtype: 1D array
+        t_angle_i: Orientation angle of triangles. Units: rad. dtype: 1D array
+        t_colors: boids individual colors, indices in the palette. dtype: 1D uint8 array
+        sprites: sprite cache used instead of polygons if given. dtype: SpriteCache
+    '''
+    t_colors = [palette_color[t_color] for t_color in np.asarray(t_colors).tolist()]
+    if sprites is not None:
+        sprites.draw(screen, t_x0_i, t_y0_i, t_angle_i, t_colors)
+        return
+
+    for t_color, vertices in zip(t_colors, triangle_vertices(t_x0_i, t_y0_i, t_angle_i).tolist()):
+        pygame.draw.polygon(screen, t_color, vertices)
+    return
+
+
+#Define flock points drawing function:
+def draw_points(screen, rect, t_x0_i, t_y0_i, t_colors, size=2):
+    '''
+    Description:
+        Draw each boid as a square point of size x size pixels, written straight into the pixel array of the
+        surface instead of drawing one polygon per boid. Points not fully inside the region are not drawn.
+    Input:
+        screen: pygame surface to draw on, 8, 16 or 32 bits per pixel. dtype: pygame.Surface
+        rect: region to draw in. dtype: pygame.Rect
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_colors: boids individual colors, indices in the palette. dtype: 1D uint8 array
+        size: point size. unit: pix. dtype: int
+    '''
+    t_x0 = np.rint(np.asarray(t_x0_i) * sim_var['width']).astype(np.intp) - size // 2
+    t_y0 = np.rint(np.asarray(t_y0_i) * sim_var['height']).astype(np.intp) - size // 2
+    inside = (t_x0 >= rect.left) & (t_x0 <= rect.right - size) & (t_y0 >= rect.top) & (t_y0 <= rect.bottom - size)
+    t_x0, t_y0 = t_x0[inside], t_y0[inside]
+    mapped_colors = np.array([screen.map_rgb(t_color) for t_color in palette_color])
+    pixel_colors = mapped_colors[np.asarray(t_colors)[inside]]
+
+    pixels = pygame.surfarray.pixels2d(screen)
+    for dx in range(size):
+        for dy in range(size):
+            pixels[t_x0 + dx, t_y0 + dy] = pixel_colors
+    del pixels #Unlock the surface
+    return
+
+
+#Define flock heatmap function:
+def flock_heatmap(rect, t_x0_i, t_y0_i, t_angle_i, mode='density', cell=None):
+    '''
+    Description:
+        Colors of a heatmap of the flock: boids are counted in square cells of the region with a 2D
+        histogram. In 'density' mode, cells are colored by the logarithm of their number of boids. In
+        'heading' mode, the hue is the mean heading of the cell boids, the saturation how aligned they are
+        and the brightness the cell density.
+    Input:
+        rect: region of the heatmap. dtype: pygame.Rect
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        mode: 'density' or 'heading'. dtype: str
+        cell: cell size. Default: sim_var['heatmap cell']. unit: pix. dtype: int
+    Output:
+        rgb: RGB color of each cell, indexed as [x, y] like pygame.surfarray. Shape: (columns, rows, 3). dtype: uint8 array
+    '''
+    cell = sim_var['heatmap cell'] if cell is None else cell
+    columns, rows = -(-rect.width // cell), -(-rect.height // cell)
+    column = np.floor((np.asarray(t_x0_i) * sim_var['width'] - rect.left) / cell).astype(np.intp)
+    row = np.floor((np.asarray(t_y0_i) * sim_var['height'] - rect.top) / cell).astype(np.intp)
+    inside = (column >= 0) & (column < columns) & (row >= 0) & (row < rows)
+    cells = column[inside] * rows + row[inside]
+
+    counts = np.bincount(cells, minlength=columns * rows).reshape(columns, rows)
+    density = np.log1p(counts) / np.log1p(max(counts.max(), 1))
+    if mode == 'density':
+        stops = np.linspace(0, 1, len(density_stops))
+        rgb = np.stack([np.interp(density, stops, density_stops[:, channel]) for channel in range(3)], axis=-1)
+        return rgb.astype(np.uint8)
+    if mode != 'heading':
+        raise ValueError('Unknown heatmap mode {}.'.format(mode))
+
+    t_angle = np.asarray(t_angle_i)[inside]
+    heading_x = np.bincount(cells, weights=np.cos(t_angle), minlength=columns * rows).reshape(columns, rows)
+    heading_y = np.bincount(cells, weights=np.sin(t_angle), minlength=columns * rows).reshape(columns, rows)
+    hue = 6 * (np.arctan2(heading_y, heading_x) / (2 * np.pi) % 1)
+    saturation = np.hypot(heading_x, heading_y) / np.maximum(counts, 1)
+
+    #HSV to RGB at full value, then faded to the background by the density:
+    sector = (np.array([5, 3, 1]) + hue[..., None]) % 6
+    rgb = 255 * (1 - saturation[..., None] * np.clip(np.minimum(sector, 4 - sector), 0, 1))
+    rgb = density[..., None] * rgb + (1 - density[..., None]) * density_stops[0]
+    return rgb.astype(np.uint8)
+
+
+#Define flock heatmap drawing function:
+def draw_heatmap(screen, rect, t_x0_i, t_y0_i, t_angle_i, mode='density', cell=None):
+    '''
+    Description:
+        Draw a heatmap of the flock over a screen region, see flock_heatmap. The cells are scaled up to the
+        region, so the cost mostly depends on the region size, not on the number of boids. Empty cells are
+        not drawn.
+    Input:
+        screen: pygame surface to draw on. dtype: pygame.Surface
+        rect: region to draw in. dtype: pygame.Rect
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        mode: 'density' or 'heading'. dtype: str
+        cell: cell size. Default: sim_var['heatmap cell']. unit: pix. dtype: int
+    '''
+    cell = sim_var['heatmap cell'] if cell is None else cell
+    heatmap = pygame.surfarray.make_surface(flock_heatmap(rect, t_x0_i, t_y0_i, t_angle_i, mode=mode, cell=cell))
+    heatmap = pygame.transform.scale(heatmap, (heatmap.get_width() * cell, heatmap.get_height() * cell))
+    heatmap.set_colorkey(color['darkgray']) #Empty cells show the background
+    screen.blit(heatmap, rect.topleft, pygame.Rect((0, 0), rect.size))
+    return
+
+
+#Define level of detail flock drawing function:
+def draw_flock(screen, rect, t_x0_i, t_y0_i, t_angle_i, t_colors, mode='auto', sprites=None):
+    '''
+    Description:
+        Draw the flock with a render mode: triangles (see draw_boids), points (see draw_points), or a density
+        or heading heatmap (see draw_heatmap). In 'auto' mode, large flocks are drawn as points, as their
+        triangles would be too small to be told apart and slow to draw.
+    Input:
+        screen: pygame surface to draw on. dtype: pygame.Surface
+        rect: region of the flock. dtype: pygame.Rect
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        t_colors: boids individual colors, indices in the palette. dtype: 1D uint8 array
+        mode: render mode, one of render_modes. dtype: str
+        sprites: sprite cache used for triangles if given. dtype: SpriteCache
+    Output:
+        mode: render mode used, 'auto' resolved to 'triangles' or 'points'. dtype: str
+    '''
+    if mode == 'auto':
+        mode = 'triangles' if len(t_x0_i) <= sim_var['point render threshold'] else 'points'
+    if mode == 'triangles':
+        draw_boids(screen, t_x0_i, t_y0_i, t_angle_i, t_colors, sprites=sprites)
+    elif mode == 'points':
+        draw_points(screen, rect, t_x0_i, t_y0_i, t_colors)
+    elif mode in ('density', 'heading'):
+        draw_heatmap(screen, rect, t_x0_i, t_y0_i, t_angle_i, mode=mode)
+    else:
+        raise ValueError('Unknown render mode {}.'.format(mode))
+    return mode
+
+
+#Define profiling overlay drawing function:
+def draw_profile(screen, rect, summary, font):
+    '''
+    Description:
+        Draw the profiling statistics in a screen region: frame time on the first line, then the slowest
+        phases on two columns, as mean / 95th percentile in ms. Phases which do not fit are not drawn.
+    Input:
+        screen: pygame surface to draw on. dtype: pygame.Surface
+        rect: region to draw in. dtype: pygame.Rect
+        summary: statistics of each phase, see Boids_Profile.Profiler.summary. dtype: dict of dict
+        font: font of the text. dtype: pygame.font.Font
+    '''
+    line_size = font.get_linesize()
+    rows = rect.height // line_size - 1
+    if 'frame' in summary:
+        frame = summary['frame']
+        text = 'Frame {:.2f} ms  p95 {:.2f}  p99 {:.2f}  ({:.0f} fps)'.format(frame['mean ms'], frame['p95 ms'], frame['p99 ms'],
+                                                                         1e3 / max(frame['mean ms'], 1e-3))
+        screen.blit(font.render(text, True, color['white'], color['darkgray']), rect.topleft)
+    phases = sorted((phase for phase in summary if phase != 'frame'), key=lambda phase: -summary[phase]['mean ms'])
+    for ii, phase in enumerate(phases[:2 * rows]):
+        text = '{} {:.2f} / {:.2f}'.format(phase, summary[phase]['mean ms'], summary[phase]['p95 ms'])
+        screen.blit(font.render(text, True, color['lightgray'], color['darkgray']),
+                    (rect.left + (ii // rows) * rect.width // 2, rect.top + (1 + ii % rows) * line_size))
+    return
+#----------------------------------------------
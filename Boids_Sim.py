@@ -0,0 +1,1048 @@
+#-----------------------------------------------------
+#BOIDS SIMULATION CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import time
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Define Global variable for the simulation:
+sim_var = {'width': 640,
+           'height': 480,
+           'fps': 30,
+           'bounding box scale': 0.1,
+           't_size': 0.01,
+           't_speed': 0.2,
+           'loop around buffer': 0.05,
+           'collision strength': 0.1,
+           'alignment strength': 0.04,
+           'cohesion scale': 0.05,
+           'number of triangles': 50,
+           'max number of triangles': 1000,
+           'controls box scale': 0.6,
+           'toggle scale': 0.03,
+           'loop around correction': 0.005,
+           'periodic edges': False,
+           'point render threshold': 2000,
+           'heatmap cell': 4}
+
+#Define boids colors palette, boid colors are stored as indices in it:
+palette = ['lightblue', 'blue', 'darkblue', 'red', 'darkgreen']
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define periodic edges function:
+def edge_period(edges=True):
+    '''
+    Description:
+        Period of the periodic edges: the side of the loop around box, from the low edge to the high edge.
+    Input:
+        edges: loop around edges toggle. dtype: bool
+    Output:
+        period: period along x and y, None if the edges are off or not periodic. dtype: tuple
+    '''
+    if not edges or not sim_var['periodic edges']:
+        return None
+    period = 1 - 2*(sim_var['bounding box scale'] - sim_var['loop around buffer'])
+    return (period, period)
+
+
+#Define loop around edges function:
+def loop_around_edges(t_x0, t_y0):
+    '''
+    Description:
+        Update the input t_x0 and t_y0 variables to loop around the edges of the bouding box of the similation.
+        Works on single boids or on the whole flock at once. With periodic edges, boids leaving the box on
+        one side enter it on the opposite side, otherwise they are put back at mirrored positions.
+    Input:
+        t_x0, t_y0: relative center coordinates of triangles. dtype: int, float or 1D array
+    Output:
+        t_x0, t_y0: relative center coordinates of triangles. dtype: int, float or 1D array
+    '''
+    low = sim_var['bounding box scale'] - sim_var['loop around buffer']
+    period = edge_period()
+    if period is not None:
+        return low + np.mod(t_x0 - low, period[0]), low + np.mod(t_y0 - low, period[1])
+    high = 1 - (sim_var['bounding box scale'] - sim_var['loop around buffer'])
+    t_x0 = np.where(t_x0 < low, 1 - t_x0 - sim_var['loop around correction'], t_x0)
+    t_x0 = np.where(t_x0 > high, 1 - t_x0 + sim_var['loop around correction'], t_x0)
+    t_y0 = np.where(t_y0 < low, 1 - t_y0 - sim_var['loop around correction'], t_y0)
+    t_y0 = np.where(t_y0 > high, 1 - t_y0 + sim_var['loop around correction'], t_y0)
+    return t_x0, t_y0
+
+
+#Define boids initialization
+def initialize_boids(N, rng=None):
+    '''
+    Description:
+        Initialize an array of boids location, velocities and colors.
+    Input:
+        N: number of boids to initialize. dtype: int.
+        rng: random number generator the boids are drawn from. Default: a new unseeded generator.
+             dtype: numpy.random.Generator
+    Output:
+        t_x0_i: Initial x position. unit: pix. dtype: 1D array
+        t_y0_i: Initial y position. unit: pix. dtype: 1D array
+        t_angle_i: Initial angle position. unit: rad. dtype: 1D array
+        t_vx0_i: Initial x velocity. unit: pix / frame. dtype: 1D array
+        t_vy0_i: Initial y velocity. unit: pix / frame. dtype: 1D array
+        t_colors: Boids individual colors, indices in the palette. dtype: 1D uint8 array
+        case_study_original_color: Test study Boid color, index in the palette. dtype: int
+    '''
+    rng = np.random.default_rng() if rng is None else rng
+    t_x0_i = rng.uniform(low=sim_var['bounding box scale'], high=1-sim_var['bounding box scale'], size=N)
+    t_y0_i = rng.uniform(low=sim_var['bounding box scale'], high=1-sim_var['bounding box scale'], size=N)
+    t_angle_i = rng.uniform(low=-np.pi, high=np.pi, size=N)
+    t_vx0_i = sim_var['t_speed'] * np.cos(t_angle_i)
+    t_vy0_i = sim_var['t_speed'] * np.sin(t_angle_i)
+    t_colors = rng.choice(3, size=N).astype(np.uint8) #lightblue, blue or darkblue
+    case_study_original_color = t_colors[0] if N > 0 else 0
+    return t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, t_colors, case_study_original_color
+
+
+#Define spatial grid index:
+class SpatialGrid:
+    '''
+    Description:
+        Uniform grid spatial index over the relative coordinates of the flock. Boids are bucketed
+        in square cells covering the extent of the flock.
+        Rebuild it once per frame, then answer nearest and radius queries for all boids at once.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        cell_size: minimum cell side length. Default gives about two boids per cell. Cells are
+                   enlarged if needed to keep at most four cells per boid. dtype: float
+        scale: weights of the x and y coordinates in distances, e.g. (1, height / width) to measure
+               distances in pixels up to a factor. dtype: tuple
+        chunk_pairs: number of candidate pairs searched at once, bounds the memory in dense regions. dtype: int
+    '''
+    def __init__(self, t_x0_i, t_y0_i, cell_size=None, scale=(1.0, 1.0), chunk_pairs=2**20):
+        self.scale = scale
+        self.cell_size = cell_size
+        self.chunk_pairs = chunk_pairs
+        self.rebuild(t_x0_i, t_y0_i)
+
+
+    def rebuild(self, t_x0_i, t_y0_i):
+        '''
+        Description:
+            Bucket the boids in the grid cells with a counting sort.
+        Input:
+            t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        '''
+        self.N = len(t_x0_i)
+        self.t_x0 = np.asarray(t_x0_i) * self.scale[0]
+        self.t_y0 = np.asarray(t_y0_i) * self.scale[1]
+        if self.N == 0:
+            self.t_x0_min, self.t_y0_min, extent_x, extent_y = 0.0, 0.0, 1.0, 1.0
+        else:
+            self.t_x0_min, self.t_y0_min = self.t_x0.min(), self.t_y0.min()
+            extent_x = max(self.t_x0.max() - self.t_x0_min, 1e-9)
+            extent_y = max(self.t_y0.max() - self.t_y0_min, 1e-9)
+        if self.cell_size is None:
+            self.cell = np.sqrt(2 * extent_x * extent_y / max(self.N, 1))
+        else:
+            self.cell = max(self.cell_size, np.sqrt(extent_x * extent_y / (4 * max(self.N, 1))))
+        self.nx = max(int(np.ceil(extent_x / self.cell)), 1)
+        self.ny = max(int(np.ceil(extent_y / self.cell)), 1)
+
+        self.ix = np.clip(np.floor((self.t_x0 - self.t_x0_min) / self.cell), 0, self.nx - 1).astype(int)
+        self.iy = np.clip(np.floor((self.t_y0 - self.t_y0_min) / self.cell), 0, self.ny - 1).astype(int)
+        cell_index = self.ix * self.ny + self.iy
+        self.order = np.argsort(cell_index, kind='stable')
+        self.cell_count = np.bincount(cell_index, minlength=self.nx * self.ny)
+        self.cell_start = np.cumsum(self.cell_count) - self.cell_count
+        return
+
+
+    def neighbour_cells(self, reach, index):
+        '''
+        Description:
+            First sorted position and boid count of the cells within reach cells of the cell of each boid.
+        Input:
+            reach: number of cells searched around the boid cell in each direction. dtype: int
+            index: boids to search around. dtype: 1D int array
+        Output:
+            start, count: sorted position and count of each cell. Shape: (len(index), (2*reach+1)**2). dtype: 2D int array
+        '''
+        offsets = np.arange(-reach, reach + 1)
+        offset_x = np.repeat(offsets, len(offsets))
+        offset_y = np.tile(offsets, len(offsets))
+        cell_x = self.ix[index, None] + offset_x[None, :]
+        cell_y = self.iy[index, None] + offset_y[None, :]
+        valid = (cell_x >= 0) & (cell_x < self.nx) & (cell_y >= 0) & (cell_y < self.ny)
+        cell_index = np.where(valid, cell_x * self.ny + cell_y, 0)
+        return self.cell_start[cell_index], np.where(valid, self.cell_count[cell_index], 0)
+
+
+    def candidates(self, reach, index=None):
+        '''
+        Description:
+            List all boid pairs (i, j) where j lies within reach cells of the cell of i, self included.
+            Pairs are grouped by i in increasing order.
+        Input:
+            reach: number of cells searched around the boid cell in each direction. dtype: int
+            index: boids to search around. Default: all boids. dtype: 1D int array
+        Output:
+            pair_i, pair_j: boid indices of each pair. dtype: 1D int array
+        '''
+        if index is None:
+            index = np.arange(self.N)
+        return self.expand_cells(index, *self.neighbour_cells(reach, index))
+
+
+    def expand_cells(self, index, start, count):
+        '''
+        Description:
+            Expand the cells around each boid into the boid pairs they hold.
+        Input:
+            index: boids searched around. dtype: 1D int array
+            start, count: sorted position and count of the cells around each boid, from neighbour_cells. dtype: 2D int array
+        Output:
+            pair_i, pair_j: boid indices of each pair. dtype: 1D int array
+        '''
+        pair_i = np.repeat(index, count.sum(axis=1))
+        start, count = start.ravel(), count.ravel()
+        ramp = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        pair_j = self.order[np.repeat(start, count) + ramp]
+        return pair_i, pair_j
+
+
+    def candidate_chunks(self, reach, index=None):
+        '''
+        Description:
+            Same pairs as candidates, yielded by chunks of whole boids of about chunk_pairs pairs each.
+            A boid with more candidates than chunk_pairs gets a chunk of its own.
+        Input:
+            reach: number of cells searched around the boid cell in each direction. dtype: int
+            index: boids to search around. Default: all boids. dtype: 1D int array
+        Output:
+            pair_i, pair_j: boid indices of each pair of the chunk. dtype: 1D int array
+        '''
+        if index is None:
+            index = np.arange(self.N)
+        boid_chunk = max(self.chunk_pairs // (2 * reach + 1)**2, 1)
+        for boid_start in range(0, len(index), boid_chunk):
+            boids = index[boid_start:boid_start + boid_chunk]
+            start, count = self.neighbour_cells(reach, boids)
+            pair_count = np.cumsum(count.sum(axis=1))
+            bounds = np.searchsorted(pair_count, np.arange(self.chunk_pairs, pair_count[-1], self.chunk_pairs))
+            bounds = np.unique(np.r_[0, bounds, len(boids)])
+            for chunk_start, chunk_end in zip(bounds[:-1], bounds[1:]):
+                chunk = slice(chunk_start, chunk_end)
+                yield self.expand_cells(boids[chunk], start[chunk], count[chunk])
+
+
+    def distance2(self, pair_i, pair_j):
+        '''
+        Description:
+            Squared weighted distance between boids of each pair.
+        Input:
+            pair_i, pair_j: boid indices of each pair. dtype: 1D int array
+        Output:
+            distance2: squared distances. dtype: 1D array
+        '''
+        return (self.t_x0[pair_i] - self.t_x0[pair_j])**2 + (self.t_y0[pair_i] - self.t_y0[pair_j])**2
+
+
+    def query_nearest(self, index=None, max_reach=8, chunk_size=1024):
+        '''
+        Description:
+            Find the closest other boid of every boid. The search starts with the surrounding cells and is
+            widened for boids with no other boid guaranteed to be closest. Boids still unresolved beyond
+            max_reach cells are compared to the whole flock by chunks of boids.
+        Input:
+            index: boids to search around. Default: all boids. dtype: 1D int array
+            max_reach: widest search in cells before comparing to the whole flock. dtype: int
+            chunk_size: number of boids compared to the whole flock at once in the fallback. dtype: int
+        Output:
+            closest_index: index of the closest boid. Boid own index if alone. dtype: 1D int array
+        '''
+        index = np.arange(self.N) if index is None else np.asarray(index, dtype=int)
+        closest_index = index.copy()
+        if self.N < 2 or len(index) == 0:
+            return closest_index
+
+        remaining = np.arange(len(index))
+        reach = 1
+        while len(remaining) > 0 and reach <= max_reach:
+            #Positions of the searched boids in remaining, to map chunks back:
+            position = np.empty(self.N, dtype=int)
+            position[index[remaining]] = np.arange(len(remaining))
+            distance2_min = np.empty(len(remaining))
+            for pair_i, pair_j in self.candidate_chunks(reach=reach, index=index[remaining]):
+                distance2 = self.distance2(pair_i, pair_j)
+                distance2[pair_i == pair_j] = np.inf #Exclude boid itself
+
+                #Minimum per boid, every boid has at least itself as candidate:
+                group_start = np.flatnonzero(np.r_[True, pair_i[1:] != pair_i[:-1]])
+                chunk_min = np.minimum.reduceat(distance2, group_start)
+                group = np.repeat(np.arange(len(group_start)), np.diff(np.r_[group_start, len(pair_i)]))
+                hit = np.flatnonzero(distance2 == chunk_min[group])
+                first = np.r_[True, group[hit][1:] != group[hit][:-1]]
+                distance2_min[position[pair_i[group_start]]] = chunk_min
+                closest_index[remaining[position[pair_i[hit[first]]]]] = pair_j[hit[first]]
+
+            #Boids further than reach cells from all candidates may have a closer boid outside of the search:
+            if reach >= max(self.nx, self.ny):
+                remaining = remaining[:0]
+            else:
+                remaining = remaining[distance2_min > (reach * self.cell)**2]
+            reach *= 2
+
+        for start in range(0, len(remaining), chunk_size):
+            far_index = index[remaining[start:start + chunk_size]]
+            distance2 = (self.t_x0[far_index, None] - self.t_x0[None, :])**2 + (self.t_y0[far_index, None] - self.t_y0[None, :])**2
+            distance2[np.arange(len(far_index)), far_index] = np.inf #Exclude boid itself
+            closest_index[remaining[start:start + chunk_size]] = np.argmin(distance2, axis=1)
+        return closest_index
+
+
+    def query_radius(self, radius):
+        '''
+        Description:
+            Find all other boids within a given weighted distance of every boid.
+        Input:
+            radius: search radius. dtype: float
+        Output:
+            neighbour_start: neighbours of boid ii are neighbour_index[neighbour_start[ii]:neighbour_start[ii+1]]. dtype: 1D int array
+            neighbour_index: concatenated neighbour indices. dtype: 1D int array
+        '''
+        if radius > 2 * self.cell:
+            #Cells too small for the radius, search a coarser grid instead:
+            grid = SpatialGrid(self.t_x0 / self.scale[0], self.t_y0 / self.scale[1], cell_size=radius,
+                               scale=self.scale, chunk_pairs=self.chunk_pairs)
+            return grid.query_radius(radius)
+        neighbour_count = np.zeros(self.N, dtype=int)
+        neighbour_index = []
+        for pair_i, pair_j in self.candidate_chunks(reach=int(np.ceil(radius / self.cell))):
+            keep = (self.distance2(pair_i, pair_j) <= radius**2) & (pair_i != pair_j)
+            neighbour_index.append(pair_j[keep])
+            neighbour_count += np.bincount(pair_i[keep], minlength=self.N)
+        neighbour_start = np.r_[0, np.cumsum(neighbour_count)]
+        return neighbour_start, np.concatenate(neighbour_index + [np.zeros(0, dtype=int)])
+
+
+#Define closest boid search:
+def find_closest(t_x0_i, t_y0_i, period=None):
+    '''
+    Description:
+        Find the closest other boid of every boid of the flock with a spatial grid. Distances are
+        measured in pixels. With periodic edges, distances are measured to the closest periodic image
+        of the other boids, see periodic_closest.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        period: period of the periodic edges, see edge_period. dtype: tuple
+    Output:
+        closest_index: index of the closest boid. Boid own index if alone. dtype: 1D int array
+    '''
+    if period is not None:
+        return periodic_closest(t_x0_i, t_y0_i, period)
+    grid = SpatialGrid(t_x0_i, t_y0_i, scale=(1.0, sim_var['height']/sim_var['width']))
+    return grid.query_nearest()
+
+
+#Define periodic closest boid search:
+def periodic_closest(t_x0_i, t_y0_i, period):
+    '''
+    Description:
+        Find the closest other boid of every boid of a flock within the periodic loop around box, with
+        minimum image distances. Images of the boids within a margin of the edges are added around the
+        box, shifted by one period, and searched with a spatial grid. A closest boid closer than the margin
+        is exact, other boids are searched again with twice the margin, up to one period.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids, inside the loop around box. dtype: 1D array
+        period: period along x and y, see edge_period. dtype: tuple
+    Output:
+        closest_index: index of the closest boid. Boid own index if alone. dtype: 1D int array
+    '''
+    N = len(t_x0_i)
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    closest_index = np.arange(N)
+    if N < 2:
+        return closest_index
+    margin = min(2 * np.sqrt(period[0] * period[1] / N), max(period))
+    search = np.arange(N)
+    while len(search) > 0:
+        source, t_x0_image, t_y0_image = periodic_images(t_x0_i, t_y0_i, period, (margin, margin))
+        grid = SpatialGrid(t_x0_image, t_y0_image, scale=scale)
+        closest_image = grid.query_nearest(index=search)
+        closest_index[search] = source[closest_image]
+
+        #Boids with a closest boid beyond the margin may have a closer image which was not added:
+        if margin >= max(period):
+            break
+        search = search[grid.distance2(search, closest_image) > (margin * min(scale))**2]
+        margin = min(2 * margin, max(period))
+    return closest_index
+
+
+#Define periodic images:
+def periodic_images(t_x0_i, t_y0_i, period, margin):
+    '''
+    Description:
+        Boids of a flock within the periodic loop around box, followed by their images shifted by one
+        period for the boids within a margin of the opposite edges.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids, inside the loop around box. dtype: 1D array
+        period: period along x and y, see edge_period. dtype: tuple
+        margin: distance to the edges along x and y within which images are added. dtype: tuple
+    Output:
+        source: boid index of each image, boids first in order. dtype: 1D int array
+        t_x0_image, t_y0_image: relative center coordinates of the images. dtype: 1D array
+    '''
+    N = len(t_x0_i)
+    low = sim_var['bounding box scale'] - sim_var['loop around buffer']
+    t_x0_rel, t_y0_rel = t_x0_i - low, t_y0_i - low
+    near_x = {-1: t_x0_rel >= period[0] - margin[0], 0: np.ones(N, dtype=bool), 1: t_x0_rel < margin[0]}
+    near_y = {-1: t_y0_rel >= period[1] - margin[1], 0: np.ones(N, dtype=bool), 1: t_y0_rel < margin[1]}
+    source, shift_x, shift_y = [np.arange(N)], [np.zeros(N)], [np.zeros(N)]
+    for sx in (-1, 0, 1):
+        for sy in (-1, 0, 1):
+            if sx == 0 and sy == 0:
+                continue
+            image = np.flatnonzero(near_x[sx] & near_y[sy])
+            source.append(image)
+            shift_x.append(np.full(len(image), sx * period[0]))
+            shift_y.append(np.full(len(image), sy * period[1]))
+    source = np.concatenate(source)
+    return source, t_x0_i[source] + np.concatenate(shift_x), t_y0_i[source] + np.concatenate(shift_y)
+
+
+#Define flock buffer allocation:
+def empty_buffer(key, capacity, dtype):
+    '''
+    Description:
+        Default allocator of the flock buffers, in private memory. See Flock.reserve.
+    Input:
+        key: name of the flock array. dtype: str
+        capacity: number of boids the buffer holds. dtype: int
+        dtype: type of the buffer. dtype: numpy dtype
+    Output:
+        buffer: uninitialized buffer. dtype: 1D array
+    '''
+    return np.empty(capacity, dtype=dtype)
+
+
+#Define steering scratch buffers:
+def steering_scratch(N, dtype=np.float64):
+    '''
+    Description:
+        Allocate the scratch buffers used to steer and move N boids without allocating arrays.
+    Input:
+        N: number of boids. dtype: int
+        dtype: float type of the flock arrays. dtype: numpy dtype
+    Output:
+        scratch: scratch buffers by name. dtype: dict
+    '''
+    return {'angle_test': np.empty((3, N), dtype=dtype),
+            't_x0_test': np.empty((3, N), dtype=dtype),
+            't_y0_test': np.empty((3, N), dtype=dtype),
+            't_x0_c': np.empty(N, dtype=dtype),
+            't_y0_c': np.empty(N, dtype=dtype),
+            't_angle_c': np.empty(N, dtype=dtype),
+            'option': np.empty(N, dtype=np.intp),
+            'option_max': np.empty(N, dtype=np.intp),
+            'option_min': np.empty(N, dtype=np.intp),
+            'ramp': np.arange(N, dtype=np.intp),
+            'mask': np.empty(N, dtype=bool),
+            'tmp': np.empty(N, dtype=dtype)}
+
+
+#Define flock steering:
+def steer_boids(t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, closest_index, separation=True, alignment=True, cohesion=True,
+                index=None, out=None, scratch=None, parameters=None, period=None):
+    '''
+    Description:
+        Compute the new heading of every boid. Every boid tests 3 options: no change, counter clockwise
+        step or clockwise step, and keeps the one moving away from (separation) or towards (cohesion) its
+        closest boid. It then turns towards the heading of its closest boid (alignment).
+        All boids are updated at once from the flock state at the start of the step.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        t_vx0_i, t_vy0_i: boids velocities. dtype: 1D array
+        closest_index: index of the closest boid of each boid. dtype: 1D int array
+        separation, alignment, cohesion: flocking rules toggles. dtype: bool
+        index: boids to steer, closest_index is then given for these boids only. Default: all boids. dtype: 1D int array
+        out: array the new headings are written to. Allocated if not given. dtype: 1D array
+        scratch: buffers from steering_scratch for the steered boids. Allocated if not given. dtype: dict
+        parameters: 'collision strength', 'alignment strength' or 'cohesion scale' used instead of sim_var,
+                    a value for all boids or one value per steered boid. dtype: dict
+        period: period of the periodic edges, closest boids are then taken at their closest image. See
+                edge_period. dtype: tuple
+    Output:
+        new_angle: boids new orientation angle, for the steered boids only. unit: rad. dtype: 1D array
+    '''
+    N = len(closest_index)
+    if scratch is None:
+        scratch = steering_scratch(N, dtype=t_x0_i.dtype)
+    if out is None:
+        out = np.empty(N, dtype=t_x0_i.dtype)
+    variables = sim_var if parameters is None else {**sim_var, **parameters}
+    dt = 1/sim_var['fps']
+    d_angle = variables['collision strength']
+
+    #Closest boids:
+    t_x0_c = np.take(t_x0_i, closest_index, out=scratch['t_x0_c'], mode='clip')
+    t_y0_c = np.take(t_y0_i, closest_index, out=scratch['t_y0_c'], mode='clip')
+    t_angle_c = np.take(t_angle_i, closest_index, out=scratch['t_angle_c'], mode='clip')
+    if index is not None:
+        t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i = t_x0_i[index], t_y0_i[index], t_angle_i[index], t_vx0_i[index], t_vy0_i[index]
+    if period is not None:
+        #Closest boids images, shifted by a whole number of periods:
+        shift = scratch['tmp']
+        for t_x0_c_image, t_x0_own, period_x in ((t_x0_c, t_x0_i, period[0]), (t_y0_c, t_y0_i, period[1])):
+            np.subtract(t_x0_c_image, t_x0_own, out=shift)
+            shift /= period_x
+            np.rint(shift, out=shift)
+            shift *= period_x
+            t_x0_c_image -= shift
+
+    #Test positions for each option. Shape: (3, N):
+    angle_test = scratch['angle_test']
+    angle_test[0] = t_angle_i
+    np.add(t_angle_i, d_angle, out=angle_test[1])
+    np.subtract(t_angle_i, d_angle, out=angle_test[2])
+    t_x0_i_test, t_y0_i_test = scratch['t_x0_test'], scratch['t_y0_test']
+    t_x0_i_test[0] = t_vx0_i
+    t_y0_i_test[0] = t_vy0_i
+    np.cos(angle_test[1:], out=t_x0_i_test[1:])
+    np.sin(angle_test[1:], out=t_y0_i_test[1:])
+    t_x0_i_test[1:] *= sim_var['t_speed']
+    t_y0_i_test[1:] *= sim_var['t_speed']
+    t_x0_i_test *= dt
+    t_y0_i_test *= dt
+    t_x0_i_test += t_x0_i
+    t_y0_i_test += t_y0_i
+
+    #Distance to closest boid for each option, computed in place of the x test positions:
+    t_x0_i_test -= t_x0_c
+    t_y0_i_test -= t_y0_c
+    np.square(t_x0_i_test, out=t_x0_i_test)
+    np.square(t_y0_i_test, out=t_y0_i_test)
+    distance_test = t_x0_i_test
+    distance_test += t_y0_i_test
+    np.sqrt(distance_test, out=distance_test)
+
+    #Separation / Cohesion: pick option index, 0 is no change. First best option as argmax / argmin,
+    #without the copy of argmax / argmin along the first axis. The y test rows are free buffers:
+    option, mask = scratch['option'], scratch['mask']
+    for pick, compare, best, option_best in ((separation, np.greater, t_y0_i_test[0], scratch['option_max']),
+                                             (cohesion, np.less, t_y0_i_test[1], scratch['option_min'])):
+        if pick:
+            option_best.fill(0)
+            np.copyto(best, distance_test[0])
+            for ii in (1, 2):
+                compare(distance_test[ii], best, out=mask)
+                np.copyto(best, distance_test[ii], where=mask)
+                np.copyto(option_best, ii, where=mask)
+    if separation and cohesion:
+        #If below coherence scale: repel each other, if above it then atrack each other:
+        np.less_equal(distance_test[0], variables['cohesion scale'], out=mask)
+        np.copyto(option, scratch['option_min'])
+        np.copyto(option, scratch['option_max'], where=mask)
+    elif separation:
+        np.copyto(option, scratch['option_max'])
+    elif cohesion:
+        np.greater(distance_test[0], variables['cohesion scale'], out=mask)
+        option.fill(0)
+        np.copyto(option, scratch['option_min'], where=mask)
+    else:
+        option.fill(0)
+    option *= N
+    option += scratch['ramp']
+    np.take(angle_test.ravel(), option, out=out, mode='clip')
+
+    #Alignment: steer in nearest triangle direction:
+    if alignment:
+        diff_angle = np.subtract(t_angle_c, out, out=scratch['tmp'])
+        np.sign(diff_angle, out=diff_angle)
+        diff_angle *= variables['alignment strength']
+        out += diff_angle
+    return out
+
+
+#Define flock integration:
+def integrate_boids(t_x0_i, t_y0_i, t_vx0_i, t_vy0_i, t_angle_i, scratch=None):
+    '''
+    Description:
+        Move the boids by one frame with their current velocities, then point their velocities
+        along their new headings. All arrays are updated in place.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_vx0_i, t_vy0_i: boids velocities. dtype: 1D array
+        t_angle_i: boids new orientation angle. unit: rad. dtype: 1D array
+        scratch: buffers from steering_scratch. Allocated if not given. dtype: dict
+    Output:
+        t_x0_i, t_y0_i, t_vx0_i, t_vy0_i: updated positions and velocities. dtype: 1D array
+    '''
+    step = np.empty_like(t_x0_i) if scratch is None else scratch['tmp']
+    np.multiply(t_vx0_i, 1/sim_var['fps'], out=step)
+    t_x0_i += step
+    np.multiply(t_vy0_i, 1/sim_var['fps'], out=step)
+    t_y0_i += step
+    np.cos(t_angle_i, out=t_vx0_i)
+    np.sin(t_angle_i, out=t_vy0_i)
+    t_vx0_i *= sim_var['t_speed']
+    t_vy0_i *= sim_var['t_speed']
+    return t_x0_i, t_y0_i, t_vx0_i, t_vy0_i
+
+
+#Define flock step:
+def step_boids(t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, separation=True, alignment=True, cohesion=True, paused=False,
+               closest_index=None):
+    '''
+    Description:
+        Take one step of the whole flock: steer every boid, then move it. See steer_boids.
+        Positions and velocities are updated in place.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        t_vx0_i, t_vy0_i: boids velocities. dtype: 1D array
+        separation, alignment, cohesion: flocking rules toggles. dtype: bool
+        paused: if True, the flock is returned unchanged. dtype: bool
+        closest_index: index of the closest boid of each boid. Searched if not given. dtype: 1D int array
+    Output:
+        t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i: updated flock arrays. dtype: 1D array
+    '''
+    if paused:
+        return t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i
+
+    if closest_index is None:
+        closest_index = find_closest(t_x0_i, t_y0_i)
+    t_angle_i = steer_boids(t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i, closest_index,
+                            separation=separation, alignment=alignment, cohesion=cohesion)
+    t_x0_i, t_y0_i, t_vx0_i, t_vy0_i = integrate_boids(t_x0_i, t_y0_i, t_vx0_i, t_vy0_i, t_angle_i)
+    return t_x0_i, t_y0_i, t_angle_i, t_vx0_i, t_vy0_i
+
+
+#Define flock container:
+class Flock:
+    '''
+    Description:
+        Flock state as a structure of arrays: positions, headings and velocities are contiguous float
+        arrays and colors are uint8 indices in the palette. Scratch buffers are allocated once, so that
+        looping around edges, steering and moving the flock do not allocate arrays.
+        The arrays are views of the first N boids of buffers of larger capacity, so that boids can be
+        added or removed without reinitializing the flock. See resize.
+        New boids are drawn from the flock own random number generator, so that flocks of the same seed
+        are reproducible whatever other flocks are simulated. See Boids_Checkpoint to save its state.
+    Input:
+        N: number of boids. dtype: int
+        dtype: float type of the flock arrays, np.float32 halves the memory per boid. dtype: numpy dtype
+        capacity: initial number of boids the buffers can hold. Default: N. dtype: int
+        seed: seed of the random number generator. Default: unseeded. dtype: int
+    '''
+    flock_arrays = ('t_x0_i', 't_y0_i', 't_angle_i', 't_vx0_i', 't_vy0_i', 't_colors', 'new_angle')
+
+    def __init__(self, N, dtype=np.float64, capacity=None, seed=None):
+        self.N = 0
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.default_rng(seed)
+        self.capacity = 0
+        self.buffers = {}
+        self.scratch_buffers = {}
+        self.allocator = empty_buffer
+        self.reserve(max(N, capacity or 0))
+        self.resize(N)
+
+
+    def reserve(self, capacity, allocator=None):
+        '''
+        Description:
+            Grow the buffers to hold at least capacity boids, keeping the current boids. If an allocator is
+            given, the buffers are moved to buffers of this allocator, also used when they grow later,
+            e.g. to keep the flock in the shared memory of Boids_Parallel.ParallelEngine.
+        Input:
+            capacity: number of boids the buffers must hold. dtype: int
+            allocator: function of the flock array name, capacity and dtype returning a 1D buffer.
+                       Default: current allocator, empty_buffer for a new flock. dtype: callable
+        '''
+        if allocator is not None:
+            self.allocator = allocator
+        elif capacity <= self.capacity and self.buffers:
+            return
+        capacity = max(capacity, self.capacity)
+        buffers = {key: self.allocator(key, capacity, np.dtype(np.uint8 if key == 't_colors' else self.dtype))
+                   for key in self.flock_arrays}
+        for key, buffer in self.buffers.items():
+            buffers[key][:self.N] = buffer[:self.N]
+        self.buffers = buffers
+        self.scratch_buffers = steering_scratch(capacity, dtype=self.dtype)
+        self.capacity = capacity
+        self.set_views()
+        return
+
+
+    def set_views(self):
+        '''
+        Description:
+            Point the flock arrays and scratch buffers to the first N boids of the buffers. 2D scratch
+            buffers are reshaped from the start of their memory to stay contiguous.
+        '''
+        for key in self.flock_arrays:
+            setattr(self, key, self.buffers[key][:self.N])
+        self.scratch = {key: buffer.ravel()[:3 * self.N].reshape(3, self.N) if buffer.ndim == 2 else buffer[:self.N]
+                        for key, buffer in self.scratch_buffers.items()}
+        return
+
+
+    def resize(self, N):
+        '''
+        Description:
+            Change the number of boids. New boids are initialized randomly after the current ones, growing
+            the buffers geometrically if needed. Removed boids are the last ones and the buffers are kept.
+            Remaining boids keep their positions, headings and colors.
+        Input:
+            N: new number of boids. dtype: int
+        '''
+        N_old = self.N
+        if N > self.capacity:
+            self.reserve(max(N, 2 * self.capacity))
+        self.N = N
+        if N > N_old:
+            new_boids = initialize_boids(N - N_old, rng=self.rng)
+            for key, array in zip(('t_x0_i', 't_y0_i', 't_angle_i', 't_vx0_i', 't_vy0_i', 't_colors'), new_boids):
+                self.buffers[key][N_old:N] = array
+        self.set_views()
+        return
+
+
+    def loop_around_edges(self):
+        '''
+        Description:
+            Loop the boids around the edges of the bounding box, in place. See loop_around_edges.
+        '''
+        low = sim_var['bounding box scale'] - sim_var['loop around buffer']
+        high = 1 - (sim_var['bounding box scale'] - sim_var['loop around buffer'])
+        period = edge_period()
+        if period is not None:
+            for t_x0, period_x in ((self.t_x0_i, period[0]), (self.t_y0_i, period[1])):
+                t_x0 -= low
+                np.mod(t_x0, period_x, out=t_x0)
+                t_x0 += low
+            return
+        mask, tmp = self.scratch['mask'], self.scratch['tmp']
+        for t_x0 in (self.t_x0_i, self.t_y0_i):
+            np.less(t_x0, low, out=mask)
+            np.subtract(1, t_x0, out=tmp)
+            tmp -= sim_var['loop around correction']
+            np.copyto(t_x0, tmp, where=mask)
+            np.greater(t_x0, high, out=mask)
+            np.subtract(1, t_x0, out=tmp)
+            tmp += sim_var['loop around correction']
+            np.copyto(t_x0, tmp, where=mask)
+        return
+
+
+    def steer(self, closest_index, separation=True, alignment=True, cohesion=True, parameters=None, period=None):
+        '''
+        Description:
+            Compute the new headings of the flock in its new_angle buffer. See steer_boids.
+        Input:
+            closest_index: index of the closest boid of each boid. dtype: 1D int array
+            separation, alignment, cohesion: flocking rules toggles. dtype: bool
+            parameters: steering variables used instead of sim_var, see steer_boids. dtype: dict
+            period: period of the periodic edges, see edge_period. dtype: tuple
+        Output:
+            new_angle: boids new orientation angle. unit: rad. dtype: 1D array
+        '''
+        return steer_boids(self.t_x0_i, self.t_y0_i, self.t_angle_i, self.t_vx0_i, self.t_vy0_i, closest_index,
+                           separation=separation, alignment=alignment, cohesion=cohesion,
+                           out=self.new_angle, scratch=self.scratch, parameters=parameters, period=period)
+
+
+    def integrate(self):
+        '''
+        Description:
+            Move the flock and take the headings of the new_angle buffer. The heading buffers are swapped.
+        '''
+        integrate_boids(self.t_x0_i, self.t_y0_i, self.t_vx0_i, self.t_vy0_i, self.new_angle, scratch=self.scratch)
+        self.buffers['t_angle_i'], self.buffers['new_angle'] = self.buffers['new_angle'], self.buffers['t_angle_i']
+        self.t_angle_i, self.new_angle = self.new_angle, self.t_angle_i
+        return
+
+
+    def step(self, closest_index, separation=True, alignment=True, cohesion=True, paused=False, parameters=None,
+             period=None):
+        '''
+        Description:
+            Take one step of the whole flock in place. See step_boids.
+        Input:
+            closest_index: index of the closest boid of each boid. dtype: 1D int array
+            separation, alignment, cohesion: flocking rules toggles. dtype: bool
+            paused: if True, the flock is unchanged. dtype: bool
+            parameters: steering variables used instead of sim_var, see steer_boids. dtype: dict
+            period: period of the periodic edges, see edge_period. dtype: tuple
+        '''
+        if paused:
+            return
+        self.steer(closest_index, separation=separation, alignment=alignment, cohesion=cohesion, parameters=parameters,
+                   period=period)
+        self.integrate()
+        return
+
+
+#Define cluster merging:
+def merge_clusters(labels, label_i, label_j):
+    '''
+    Description:
+        Merge the clusters linked by pairs of cluster labels under their smallest boid index. Labels are
+        spread to linked clusters as the smallest label, with pointer jumping.
+    Input:
+        labels: cluster of each boid, smallest boid index of the cluster. dtype: 1D int array
+        label_i, label_j: clusters linked to each other. dtype: 1D int array
+    Output:
+        labels: cluster of each boid after merging. dtype: 1D int array
+    '''
+    link = label_i != label_j
+    if not np.any(link):
+        return labels
+    link = np.unique(label_i[link] * len(labels) + label_j[link])
+    root, link_index = np.unique(np.r_[link // len(labels), link % len(labels)], return_inverse=True)
+    link_i, link_j = np.split(link_index.ravel(), 2)
+    merged = np.arange(len(root))
+    while True:
+        merged_new = merged.copy()
+        np.minimum.at(merged_new, link_i, merged[link_j])
+        np.minimum.at(merged_new, link_j, merged[link_i])
+        merged_new = merged_new[merged_new]
+        if np.array_equal(merged_new, merged):
+            break
+        merged = merged_new
+    labels[root] = root[merged]
+    return labels[labels]
+
+
+#Define flock clusters:
+def flock_clusters(t_x0_i, t_y0_i, radius, scale=(1.0, 1.0), chunk_pairs=2**20, period=None):
+    '''
+    Description:
+        Split the flock in clusters: boids closer than radius are in the same cluster, as are boids linked
+        by a chain of such boids. Boids are bucketed in grid cells of side radius / (2 * sqrt(2)): boids of
+        cells close enough that all their boids are within radius are linked without comparing boids, other
+        pairs of cells within radius are compared by chunks of about chunk_pairs boid pairs, skipping the
+        pairs of cells already in one cluster. The memory does not grow with the number of pairs within radius.
+        With periodic edges, distances are minimum image distances: images of the boids within radius of the
+        edges are clustered with the boids and each boid joins the clusters of its images.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        radius: maximum distance between neighbours of a cluster. dtype: float
+        scale: weights of the x and y coordinates in distances. dtype: tuple
+        chunk_pairs: number of boid pairs compared at once. dtype: int
+        period: period of the periodic edges, see edge_period. dtype: tuple
+    Output:
+        labels: cluster of each boid, smallest boid index of the cluster. dtype: 1D int array
+    '''
+    labels = np.arange(len(t_x0_i))
+    if len(t_x0_i) < 2:
+        return labels
+    if period is not None:
+        margin = (min(radius / scale[0], period[0]), min(radius / scale[1], period[1]))
+        source, t_x0_image, t_y0_image = periodic_images(t_x0_i, t_y0_i, period, margin)
+        image_labels = flock_clusters(t_x0_image, t_y0_image, radius, scale=scale, chunk_pairs=chunk_pairs)
+        return merge_clusters(labels, source, source[image_labels])
+    grid = SpatialGrid(t_x0_i, t_y0_i, cell_size=radius / (2 * np.sqrt(2)), scale=scale, chunk_pairs=chunk_pairs)
+    cell = np.flatnonzero(grid.cell_count)
+    first = grid.order[grid.cell_start[cell]]
+
+    #Neighbouring cells by distance, within radius of the cell for some boids, or for all boids:
+    reach = int(np.ceil(radius / grid.cell))
+    offsets = np.arange(-reach, reach + 1)
+    offset_x, offset_y = np.repeat(offsets, len(offsets)), np.tile(offsets, len(offsets))
+    gap2 = (np.maximum(np.abs(offset_x) - 1, 0)**2 + np.maximum(np.abs(offset_y) - 1, 0)**2) * grid.cell**2
+    span2 = ((np.abs(offset_x) + 1)**2 + (np.abs(offset_y) + 1)**2) * grid.cell**2
+    half = ((offset_x > 0) | ((offset_x == 0) & (offset_y >= 0))) & (gap2 <= radius**2) #Each pair of cells once
+    nearest = np.argsort(span2[half], kind='stable')
+    offset_x, offset_y, span2 = offset_x[half][nearest], offset_y[half][nearest], span2[half][nearest]
+
+    cell_low, cell_high = np.zeros(grid.nx * grid.ny, dtype=int), np.zeros(grid.nx * grid.ny, dtype=int)
+    for dx, dy, pair_span2 in zip(offset_x, offset_y, span2):
+        #Pairs of non empty cells:
+        pair_x, pair_y = cell // grid.ny + dx, cell % grid.ny + dy
+        valid = (pair_x < grid.nx) & (pair_y >= 0) & (pair_y < grid.ny)
+        cell_a, cell_b = cell[valid], (pair_x * grid.ny + pair_y)[valid]
+        cell_a, cell_b = cell_a[grid.cell_count[cell_b] > 0], cell_b[grid.cell_count[cell_b] > 0]
+
+        if pair_span2 <= radius**2:
+            #All boids of both cells within radius, merged through the first boid of each cell:
+            if dx == 0 and dy == 0:
+                labels[grid.order] = np.repeat(first, grid.cell_count[cell])
+            else:
+                labels = merge_clusters(labels, labels[grid.order[grid.cell_start[cell_a]]],
+                                        labels[grid.order[grid.cell_start[cell_b]]])
+            continue
+
+        while len(cell_a) > 0:
+            #Skip the pairs of cells with all their boids in one cluster:
+            label_sorted = labels[grid.order]
+            cell_low[cell] = np.minimum.reduceat(label_sorted, grid.cell_start[cell])
+            cell_high[cell] = np.maximum.reduceat(label_sorted, grid.cell_start[cell])
+            open_pair = (cell_low[cell_a] != cell_high[cell_a]) | (cell_low[cell_b] != cell_high[cell_b]) | (cell_low[cell_a] != cell_low[cell_b])
+            cell_a, cell_b = cell_a[open_pair], cell_b[open_pair]
+            if len(cell_a) == 0:
+                break
+
+            #Compare the boids of the first pairs of cells, about chunk_pairs boid pairs:
+            count_a, count_b = grid.cell_count[cell_a], grid.cell_count[cell_b]
+            split = max(np.searchsorted(np.cumsum(count_a * count_b), grid.chunk_pairs, side='right'), 1)
+            count, count_b = count_a[:split] * count_b[:split], count_b[:split]
+            pair = np.repeat(np.arange(split), count)
+            ramp = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            pair_i = grid.order[grid.cell_start[cell_a[pair]] + ramp // count_b[pair]]
+            pair_j = grid.order[grid.cell_start[cell_b[pair]] + ramp % count_b[pair]]
+            cell_a, cell_b = cell_a[split:], cell_b[split:]
+            keep = grid.distance2(pair_i, pair_j) <= radius**2
+            labels = merge_clusters(labels, labels[pair_i[keep]], labels[pair_j[keep]])
+    return labels
+
+
+#Define flock summary statistics:
+def flock_statistics(t_x0_i, t_y0_i, t_angle_i, closest_index, cluster_radius=None, period=None):
+    '''
+    Description:
+        Summary statistics of the flock state.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        closest_index: index of the closest boid of each boid. dtype: 1D int array
+        cluster_radius: if given, also count clusters of boids, see flock_clusters. dtype: float
+        period: period of the periodic edges for minimum image distances, see edge_period. dtype: tuple
+    Output:
+        statistics: polarization (norm of the mean heading, 1 if all boids are aligned) and mean
+                    nearest neighbour distance in relative units. With cluster_radius, number of clusters
+                    of at least 2 boids and fraction of the boids in the largest cluster. dtype: dict
+    '''
+    if len(t_x0_i) == 0:
+        statistics = {'polarization': 0.0, 'mean nearest distance': 0.0}
+        if cluster_radius is not None:
+            statistics.update({'cluster count': 0, 'largest cluster': 0.0})
+        return statistics
+    dx, dy = t_x0_i[closest_index] - t_x0_i, t_y0_i[closest_index] - t_y0_i
+    if period is not None:
+        dx, dy = dx - np.rint(dx / period[0]) * period[0], dy - np.rint(dy / period[1]) * period[1]
+    distance = np.sqrt(dx**2 + dy**2)
+    statistics = {'polarization': float(np.hypot(np.mean(np.cos(t_angle_i)), np.mean(np.sin(t_angle_i)))),
+                  'mean nearest distance': float(np.mean(distance))}
+    if cluster_radius is not None:
+        cluster_size = np.bincount(flock_clusters(t_x0_i, t_y0_i, cluster_radius, scale=(1.0, sim_var['height']/sim_var['width']),
+                                                  period=period))
+        statistics.update({'cluster count': int(np.count_nonzero(cluster_size >= 2)),
+                           'largest cluster': float(cluster_size.max() / len(t_x0_i))})
+    return statistics
+
+
+#Define headless simulation:
+def run_headless(N, steps, separation=True, alignment=True, cohesion=True, edges=True, processes=0,
+                 dtype=np.float64, recorder=None, seed=None, flock=None, stream=None):
+    '''
+    Description:
+        Run the flocking rules without GUI and print timing and summary statistics.
+    Input:
+        N: number of boids, ignored if a flock is given. dtype: int
+        steps: number of steps to simulate. dtype: int
+        separation, alignment, cohesion: flocking rules toggles. dtype: bool
+        edges: loop around edges toggle. dtype: bool
+        processes: number of worker processes of the parallel engine, 0 to run serially. Not available with
+                   periodic edges. dtype: int
+        dtype: float type of the flock arrays. dtype: numpy dtype
+        recorder: recorder the flock of each step is written to. Closed at the end. dtype: Boids_Record.Recorder
+        seed: seed of the random number generator of the flock. dtype: int
+        flock: flock to continue, e.g. loaded from a checkpoint, instead of a new random flock. dtype: Flock
+        stream: stream server the flock of each step is published to. Closed at the end. dtype: Boids_Stream.StreamServer
+    Output:
+        flock: final flock. dtype: Flock
+    '''
+    period = edge_period(edges)
+    if period is not None and processes > 0:
+        raise ValueError('The parallel engine does not support periodic edges.')
+    if flock is None:
+        flock = Flock(N, dtype=dtype, seed=seed)
+    N, dtype = flock.N, flock.dtype
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    toggles = {'separation': separation, 'alignment': alignment, 'cohesion': cohesion}
+    engine = None
+    if processes > 0:
+        from Boids_Parallel import ParallelEngine
+        engine = ParallelEngine(flock.capacity, processes=processes, dtype=dtype)
+        flock.reserve(flock.capacity, allocator=engine.allocate)
+        timing = {'edges': 0.0, 'parallel steering': 0.0, 'integration': 0.0}
+    else:
+        timing = {'edges': 0.0, 'neighbours': 0.0, 'steering': 0.0, 'integration': 0.0}
+    if recorder is not None:
+        timing['recording'] = 0.0
+    if stream is not None:
+        timing['streaming'] = 0.0
+
+    time_start = time.perf_counter()
+    try:
+        for step in range(steps):
+            time_0 = time.perf_counter()
+            if edges:
+                flock.loop_around_edges()
+            time_1 = time.perf_counter()
+            if engine is not None:
+                closest_index, new_angle = engine.steer(flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_vx0_i,
+                                                        flock.t_vy0_i, **toggles)
+                if not np.shares_memory(new_angle, flock.new_angle):
+                    np.copyto(flock.new_angle, new_angle)
+            else:
+                if period is not None:
+                    closest_index = find_closest(flock.t_x0_i, flock.t_y0_i, period=period)
+                else:
+                    closest_index = SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest()
+                time_2 = time.perf_counter()
+                flock.steer(closest_index, period=period, **toggles)
+            time_3 = time.perf_counter()
+            flock.integrate()
+            time_4 = time.perf_counter()
+
+            timing['edges'] += time_1 - time_0
+            if engine is not None:
+                timing['parallel steering'] += time_3 - time_1
+            else:
+                timing['neighbours'] += time_2 - time_1
+                timing['steering'] += time_3 - time_2
+            timing['integration'] += time_4 - time_3
+            if recorder is not None:
+                recorder.write(flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_colors)
+                timing['recording'] += time.perf_counter() - time_4
+            if stream is not None:
+                time_5 = time.perf_counter()
+                stream.publish(step + 1, flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_colors)
+                timing['streaming'] += time.perf_counter() - time_5
+    finally:
+        if engine is not None:
+            flock.reserve(flock.capacity, allocator=empty_buffer)
+            engine.close()
+        if recorder is not None:
+            recorder.close()
+        if stream is not None:
+            stream_stats = stream.stats()
+            stream.close()
+    time_total = time.perf_counter() - time_start
+
+    #Print report:
+    steps = max(steps, 1)
+    print('Boids: {}  Steps: {}  Total time: {:.3f} s'.format(N, steps, time_total))
+    print('Steps / s: {:.1f}  Boid steps / s: {:.3g}'.format(steps / time_total, N * steps / time_total))
+    for phase, phase_time in timing.items():
+        print('  {:<18s} {:8.3f} ms / step  ({:5.1f} %)'.format(phase, 1e3 * phase_time / steps, 100 * phase_time / time_total))
+    if stream is not None:
+        print('Stream: ' + '  '.join('{}: {}'.format(key, value) for key, value in stream_stats.items()))
+    closest_index = find_closest(flock.t_x0_i, flock.t_y0_i, period=period)
+    for key, value in flock_statistics(flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, closest_index,
+                                       cluster_radius=sim_var['cohesion scale'], period=period).items():
+        print('{}: {:.4g}'.format(key.capitalize(), value))
+    return flock
+#----------------------------------------------
@@ -0,0 +1,325 @@
+#-----------------------------------------------------
+#BOIDS STREAMING CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import asyncio
+import json
+import os
+import struct
+import threading
+from Boids_Sim import sim_var, palette
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Message header: kind and payload size. Kinds are b'INFO' (JSON simulation variables and palette, sent once
+#on connection) and b'FRAM' (one flock frame):
+message_header = struct.Struct('<4sI')
+
+#Byte sent by a viewer when it is ready for the next frame:
+frame_request = b'\x01'
+
+#Frame payload header: step number and number of boids, followed by float32 x, y and heading arrays and the
+#uint8 palette indices:
+frame_header = struct.Struct('<QI')
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define address parsing function:
+def parse_address(address):
+    '''
+    Description:
+        Socket address of a stream server: 'unix:PATH' for a Unix socket, 'HOST:PORT' or 'PORT' for TCP.
+    Input:
+        address: server address. dtype: str
+    Output:
+        address: ('unix', path) or ('tcp', host, port). dtype: tuple
+    '''
+    if address.startswith('unix:'):
+        return ('unix', address[len('unix:'):])
+    host, _, port = address.rpartition(':')
+    return ('tcp', host or '127.0.0.1', int(port))
+
+
+#Define frame encoding function:
+def encode_frame(step, t_x0_i, t_y0_i, t_angle_i, t_colors):
+    '''
+    Description:
+        Binary message of a flock frame: 13 bytes per boid, positions and headings in single precision.
+    Input:
+        step: step number. dtype: int
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+        t_colors: boids colors, indices in the palette. dtype: 1D uint8 array
+    Output:
+        message: frame message, header included. dtype: bytes
+    '''
+    N = len(t_x0_i)
+    message = bytearray(message_header.size + frame_header.size + 13 * N)
+    message_header.pack_into(message, 0, b'FRAM', len(message) - message_header.size)
+    frame_header.pack_into(message, message_header.size, step, N)
+    offset = message_header.size + frame_header.size
+    for array in (t_x0_i, t_y0_i, t_angle_i):
+        np.frombuffer(message, dtype=np.float32, count=N, offset=offset)[:] = array
+        offset += 4 * N
+    np.frombuffer(message, dtype=np.uint8, count=N, offset=offset)[:] = t_colors
+    return bytes(message)
+
+
+#Define frame decoding function:
+def decode_frame(payload):
+    '''
+    Description:
+        Flock arrays of a frame message payload, see encode_frame. The arrays are read-only views of the payload.
+    Input:
+        payload: frame message without its message header. dtype: bytes
+    Output:
+        step: step number. dtype: int
+        t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D float32 array
+        t_angle_i: boids orientation angle. unit: rad. dtype: 1D float32 array
+        t_colors: boids colors, indices in the palette. dtype: 1D uint8 array
+    '''
+    step, N = frame_header.unpack_from(payload, 0)
+    offset = frame_header.size
+    arrays = []
+    for ii in range(3):
+        arrays.append(np.frombuffer(payload, dtype=np.float32, count=N, offset=offset))
+        offset += 4 * N
+    arrays.append(np.frombuffer(payload, dtype=np.uint8, count=N, offset=offset))
+    return (step, *arrays)
+
+
+#Define message reading coroutine:
+async def read_message(reader):
+    '''
+    Description:
+        Read one message of a stream server.
+    Input:
+        reader: stream connected to the server. dtype: asyncio.StreamReader
+    Output:
+        kind: message kind, b'INFO' or b'FRAM'. dtype: bytes
+        payload: message payload. dtype: bytes
+    '''
+    kind, size = message_header.unpack(await reader.readexactly(message_header.size))
+    return kind, await reader.readexactly(size)
+
+
+#Define frame request coroutine:
+async def next_frame(reader, writer):
+    '''
+    Description:
+        Request the next frame from a stream server and read it. The server sends the latest frame published,
+        at once if it was not sent yet, frames published in between are skipped.
+    Input:
+        reader, writer: streams connected to the server. dtype: asyncio.StreamReader, asyncio.StreamWriter
+    Output:
+        step, t_x0_i, t_y0_i, t_angle_i, t_colors: decoded frame, see decode_frame. dtype: tuple
+    '''
+    writer.write(frame_request)
+    await writer.drain()
+    kind, payload = await read_message(reader)
+    if kind != b'FRAM':
+        raise ValueError('Unexpected stream message {}.'.format(kind))
+    return decode_frame(payload)
+
+
+#Define connection coroutine:
+async def open_stream(address):
+    '''
+    Description:
+        Connect to a stream server.
+    Input:
+        address: server address, see parse_address. dtype: str
+    Output:
+        reader, writer: streams of the connection. dtype: asyncio.StreamReader, asyncio.StreamWriter
+    '''
+    address = parse_address(address)
+    if address[0] == 'unix':
+        return await asyncio.open_unix_connection(address[1])
+    return await asyncio.open_connection(address[1], address[2])
+
+
+#Define stream server:
+class StreamServer:
+    '''
+    Description:
+        Broadcast the flock frames of a simulation to viewers connected to a TCP or Unix socket. The server
+        runs an asyncio event loop in a background thread, so publish never waits for the viewers. A viewer
+        requests each frame it is ready to read, see next_frame, and only the latest frame is kept for it:
+        frames published before the viewer requests one are dropped, so slow viewers skip frames instead
+        of queueing them in the socket buffers. Frames are only encoded when viewers are connected.
+    Input:
+        address: server address, see parse_address. Port 0 picks a free port, see self.address. dtype: str
+    '''
+    def __init__(self, address):
+        self.address = address
+        self.clients = []
+        self.frames = 0
+        self.sent = 0
+        self.dropped = 0
+        self.loop = None
+        self.stop_future = None
+        self.error = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='boids stream server', daemon=True)
+
+
+    def start(self):
+        '''
+        Description:
+            Start the server thread and wait until the socket listens.
+        '''
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+
+    def run(self):
+        '''
+        Description:
+            Server thread: run the event loop until close.
+        '''
+        try:
+            asyncio.run(self.serve())
+        except Exception as error:
+            self.error = error
+        self.ready.set()
+        return
+
+
+    async def serve(self):
+        '''
+        Description:
+            Listen on the socket until close.
+        '''
+        self.loop = asyncio.get_running_loop()
+        self.stop_future = self.loop.create_future()
+        address = parse_address(self.address)
+        if address[0] == 'unix':
+            if os.path.exists(address[1]):
+                os.remove(address[1])
+            server = await asyncio.start_unix_server(self.handle_client, address[1])
+        else:
+            server = await asyncio.start_server(self.handle_client, address[1], address[2])
+            self.address = '{}:{}'.format(address[1], server.sockets[0].getsockname()[1])
+        self.ready.set()
+        async with server:
+            await self.stop_future
+            for client in list(self.clients):
+                client['writer'].close()
+                client['event'].set()
+            await asyncio.gather(*[client['task'] for client in self.clients], return_exceptions=True)
+        if address[0] == 'unix' and os.path.exists(address[1]):
+            os.remove(address[1])
+        return
+
+
+    async def handle_client(self, reader, writer):
+        '''
+        Description:
+            Send the simulation variables and palette to a new viewer, then, for each frame request of the
+            viewer, the latest frame published, waiting for a new one if it was already sent.
+        Input:
+            reader, writer: streams of the viewer connection. dtype: asyncio.StreamReader, asyncio.StreamWriter
+        '''
+        client = {'writer': writer, 'frame': None, 'event': asyncio.Event(), 'task': asyncio.current_task()}
+        info = json.dumps({'sim_var': sim_var, 'palette': palette}).encode()
+        try:
+            writer.write(message_header.pack(b'INFO', len(info)) + info)
+            await writer.drain()
+            self.clients.append(client)
+            while not self.stop_future.done():
+                if await reader.read(1) != frame_request:
+                    break #Viewer disconnected
+                while client['frame'] is None and not self.stop_future.done():
+                    await client['event'].wait()
+                    client['event'].clear()
+                frame, client['frame'] = client['frame'], None
+                if frame is None:
+                    break
+                writer.write(frame)
+                await writer.drain()
+                self.sent += 1
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if client in self.clients:
+                self.clients.remove(client)
+            writer.close()
+        return
+
+
+    def broadcast(self, frame):
+        '''
+        Description:
+            Give a frame to every viewer, replacing the frame it has not requested yet.
+        Input:
+            frame: frame message. dtype: bytes
+        '''
+        for client in self.clients:
+            if client['frame'] is not None:
+                self.dropped += 1
+            client['frame'] = frame
+            client['event'].set()
+        return
+
+
+    def publish(self, step, t_x0_i, t_y0_i, t_angle_i, t_colors):
+        '''
+        Description:
+            Send a flock frame to the connected viewers, without waiting for them. Can be called from any thread.
+        Input:
+            step: step number. dtype: int
+            t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+            t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+            t_colors: boids colors, indices in the palette. dtype: 1D uint8 array
+        '''
+        if self.error is not None:
+            raise RuntimeError('Stream server stopped.') from self.error
+        self.frames += 1
+        if not self.clients or self.stop_future.done():
+            return
+        self.loop.call_soon_threadsafe(self.broadcast, encode_frame(step, t_x0_i, t_y0_i, t_angle_i, t_colors))
+        return
+
+
+    def stats(self):
+        '''
+        Description:
+            Streaming statistics.
+        Output:
+            stats: frames published, viewers connected, frames sent to and dropped for all viewers. dtype: dict
+        '''
+        return {'frames': self.frames, 'viewers': len(self.clients), 'sent': self.sent, 'dropped': self.dropped}
+
+
+    def close(self):
+        '''
+        Description:
+            Disconnect the viewers and stop the server thread.
+        '''
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(lambda: self.stop_future.done() or self.stop_future.set_result(None))
+            self.thread.join()
+        return
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+#----------------------------------------------
@@ -0,0 +1,177 @@
+#-----------------------------------------------------
+#BOIDS PARAMETER SWEEP CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import argparse
+import itertools
+import multiprocessing
+import time
+from Boids_Sim import sim_var, Flock, SpatialGrid, initialize_boids, flock_statistics
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Simulation variables which can be swept:
+sweep_keys = ('collision strength', 'alignment strength', 'cohesion scale')
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define batched flocks nearest search:
+def batch_nearest(t_x0_i, t_y0_i, B, N):
+    '''
+    Description:
+        Closest boid of each boid of B flocks of N boids stacked in the same arrays. The flocks are shifted
+        apart along x by more than any distance within a flock, so that a single spatial grid search only
+        finds closest boids within the same flock. Grid cells are sized for the density of one flock, not
+        for the mostly empty extent of the shifted flocks.
+    Input:
+        t_x0_i, t_y0_i: relative center coordinates of boids, flock after flock. dtype: 1D array
+        B: number of flocks. dtype: int
+        N: number of boids per flock. dtype: int
+    Output:
+        closest_index: index of the closest boid of each boid. dtype: 1D int array
+    '''
+    if len(t_x0_i) == 0:
+        return np.zeros(0, dtype=int)
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    extent_x, extent_y = np.ptp(t_x0_i), np.ptp(t_y0_i)
+    shift = np.repeat(np.arange(B) * (2 * max(extent_x, extent_y) + 1), N)
+    cell_size = np.sqrt(2 * max(extent_x * scale[0], 1e-9) * max(extent_y * scale[1], 1e-9) / max(N, 1))
+    return SpatialGrid(t_x0_i + shift, t_y0_i, cell_size=cell_size, scale=scale).query_nearest()
+
+
+#Define batch of configurations:
+def run_batch(task):
+    '''
+    Description:
+        Simulate one flock per configuration, all flocks stepped together as a single flock with one value
+        of the swept simulation variables per boid. All flocks start from the same random initial state.
+    Input:
+        task: configurations, number of boids, number of steps, random seed, toggles (separation, alignment,
+              cohesion, edges), cluster radius and simulation variables. dtype: tuple
+    Output:
+        results: configuration and final flock statistics of each configuration. dtype: list of dict
+    '''
+    configurations, N, steps, seed, toggles, cluster_radius, sim_var_values = task
+    sim_var.update(sim_var_values)
+    B = len(configurations)
+    toggles = dict(toggles)
+    edges = toggles.pop('edges')
+
+    flock_0 = initialize_boids(N, rng=np.random.default_rng(seed))
+    flock = Flock(B * N)
+    for key, array in zip(('t_x0_i', 't_y0_i', 't_angle_i', 't_vx0_i', 't_vy0_i', 't_colors'), flock_0):
+        getattr(flock, key)[:] = np.tile(array, B)
+    parameters = {key: np.repeat([configuration.get(key, sim_var[key]) for configuration in configurations], N)
+                  for key in sweep_keys}
+
+    for step in range(steps):
+        if edges:
+            flock.loop_around_edges()
+        flock.step(batch_nearest(flock.t_x0_i, flock.t_y0_i, B, N), parameters=parameters, **toggles)
+
+    results = []
+    closest_index = batch_nearest(flock.t_x0_i, flock.t_y0_i, B, N)
+    for bb, configuration in enumerate(configurations):
+        boids = slice(bb * N, (bb + 1) * N)
+        statistics = flock_statistics(flock.t_x0_i[boids], flock.t_y0_i[boids], flock.t_angle_i[boids],
+                                      closest_index[boids] - bb * N, cluster_radius=cluster_radius)
+        results.append({**{key: configuration.get(key, sim_var[key]) for key in sweep_keys}, **statistics})
+    return results
+
+
+#Define parameter sweep:
+def run_sweep(configurations, N, steps, seed=1234, separation=True, alignment=True, cohesion=True, edges=True,
+              cluster_radius=None, batch_size=32, processes=0):
+    '''
+    Description:
+        Simulate a flock for each configuration of the swept simulation variables, by batches of flocks
+        stepped together, batches spread over a process pool if enabled.
+    Input:
+        configurations: swept simulation variables of each configuration, sim_var for missing keys. dtype: list of dict
+        N: number of boids per flock. dtype: int
+        steps: number of steps to simulate. dtype: int
+        seed: random seed of the initial flock, the same for all configurations. dtype: int
+        separation, alignment, cohesion, edges: toggles. dtype: bool
+        cluster_radius: distance between neighbours of a cluster. Default: cohesion scale. dtype: float
+        batch_size: number of flocks stepped together. dtype: int
+        processes: number of worker processes, 0 to run the batches serially. dtype: int
+    Output:
+        results: configuration and final flock statistics of each configuration. dtype: list of dict
+    '''
+    if sim_var['periodic edges'] and edges:
+        raise ValueError('The parameter sweep does not support periodic edges.')
+    cluster_radius = sim_var['cohesion scale'] if cluster_radius is None else cluster_radius
+    toggles = {'separation': separation, 'alignment': alignment, 'cohesion': cohesion, 'edges': edges}
+    tasks = [(configurations[ii:ii + batch_size], N, steps, seed, toggles, cluster_radius, dict(sim_var))
+             for ii in range(0, len(configurations), batch_size)]
+    if processes > 0:
+        with multiprocessing.Pool(processes) as pool:
+            batches = pool.map(run_batch, tasks)
+    else:
+        batches = [run_batch(task) for task in tasks]
+    return [result for batch in batches for result in batch]
+#----------------------------------------------
+
+
+#----------------------------------------------
+#RUN SWEEP:
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter,
+            description='Headless sweep of the flocking rules simulation variables, with flock statistics of each configuration.',
+            epilog = 'For more information on this software, contact Jordan Ducatel at jfducatel@gmail.com.')
+    parser.add_argument('--collision', type=float, nargs='+', default=[sim_var['collision strength']],
+                        help='Collision strength values. Default: {}'.format(sim_var['collision strength']))
+    parser.add_argument('--alignment', type=float, nargs='+', default=[sim_var['alignment strength']],
+                        help='Alignment strength values. Default: {}'.format(sim_var['alignment strength']))
+    parser.add_argument('--cohesion', type=float, nargs='+', default=[sim_var['cohesion scale']],
+                        help='Cohesion scale values. Default: {}'.format(sim_var['cohesion scale']))
+    parser.add_argument('--boids', type=int, default=sim_var['number of triangles'],
+                        help='Number of boids per flock. Default: {}'.format(sim_var['number of triangles']))
+    parser.add_argument('--steps', type=int, default=300,
+                        help='Number of steps to simulate. Default: 300')
+    parser.add_argument('--seed', type=int, default=1234,
+                        help='Random seed of the initial flock. Default: 1234')
+    parser.add_argument('--no-separation', action='store_true', help='Disable separation.')
+    parser.add_argument('--no-alignment', action='store_true', help='Disable alignment.')
+    parser.add_argument('--no-cohesion', action='store_true', help='Disable cohesion.')
+    parser.add_argument('--no-edges', action='store_true', help='Disable loop around edges.')
+    parser.add_argument('--cluster-radius', type=float, default=sim_var['cohesion scale'],
+                        help='Distance between neighbours of a cluster. Default: {}'.format(sim_var['cohesion scale']))
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='Number of flocks stepped together. Default: 32')
+    parser.add_argument('--processes', type=int, default=0,
+                        help='Number of worker processes the batches are spread over. Default: 0 (serial)')
+    parser.add_argument('--output', default='sweep_results.csv',
+                        help='CSV file the results are written to. Default: sweep_results.csv')
+    args = parser.parse_args()
+
+    configurations = [dict(zip(sweep_keys, values)) for values in itertools.product(args.collision, args.alignment, args.cohesion)]
+    time_start = time.perf_counter()
+    results = run_sweep(configurations, args.boids, args.steps, seed=args.seed,
+                        separation=not args.no_separation, alignment=not args.no_alignment,
+                        cohesion=not args.no_cohesion, edges=not args.no_edges,
+                        cluster_radius=args.cluster_radius, batch_size=args.batch_size, processes=args.processes)
+    time_total = time.perf_counter() - time_start
+
+    columns = list(results[0]) if results else list(sweep_keys)
+    print('  '.join('{:>21s}'.format(column) for column in columns))
+    for result in results:
+        print('  '.join('{:21.4g}'.format(result[column]) for column in columns))
+    print('Configurations: {}  Boids: {}  Steps: {}  Total time: {:.3f} s'.format(len(configurations), args.boids,
+                                                                               args.steps, time_total))
+    with open(args.output, 'w') as file:
+        file.write(','.join(columns) + '\n')
+        for result in results:
+            file.write(','.join(str(result[column]) for column in columns) + '\n')
+    print('Results written to {}'.format(args.output))
+#----------------------------------------------
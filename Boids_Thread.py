@@ -0,0 +1,269 @@
+#-----------------------------------------------------
+#BOIDS SIMULATION THREAD CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import threading
+import time
+from Boids_Sim import sim_var, SpatialGrid, edge_period, find_closest
+from Boids_Checkpoint import save_checkpoint
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Flock arrays copied in the snapshots:
+snapshot_arrays = ('t_x0_i', 't_y0_i', 't_angle_i', 't_colors')
+
+#Position change between two snapshots above which a boid looped around the edges and is not interpolated:
+loop_around_jump = 0.5
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define simulation thread:
+class SimulationThread:
+    '''
+    Description:
+        Run the flock steps in a worker thread on a fixed timestep of 1/fps, independently of the display.
+        After the edges and closest boids of a step are computed, the flock is copied in a snapshot. The
+        two most recent snapshots are published and a third one is written by the worker, so the render
+        loop can interpolate between the published snapshots while the next one is computed.
+        The flock must only be changed through set_controls and resize, and saved through save_checkpoint,
+        while the thread runs.
+    Input:
+        flock: flock to simulate. dtype: Flock
+        speed: simulation time per real time, the worker runs fps * speed steps per second. 0 runs the
+               steps as fast as possible. dtype: float
+        max_lag: real time behind schedule after which the worker stops catching up. unit: s. dtype: float
+        recorder: recorder the flock of each step is written to, except when paused. dtype: Boids_Record.Recorder
+        stream: stream server the flock of each step is published to. dtype: Boids_Stream.StreamServer
+        controls: initial toggle values by name, see set_controls. Missing toggles are on, and the
+                  simulation is not paused. dtype: dict
+    '''
+    def __init__(self, flock, speed=1.0, max_lag=0.25, recorder=None, stream=None, controls=None):
+        self.flock = flock
+        self.recorder = recorder
+        self.stream = stream
+        self.speed = speed
+        self.max_lag = max_lag
+        self.controls = {'separation': True, 'alignment': True, 'cohesion': True, 'edges': True, 'paused': False}
+        self.controls.update(controls or {})
+        self.pending_N = None
+        self.pending_checkpoint = None
+        self.step_count = 0
+        self.error = None
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.slots = [{'N': 0, 'time': 0.0, 'closest': 0, 'step': 0} for slot in range(3)]
+        self.previous, self.latest, self.back = 0, 1, 2
+        self.render = {}
+        self.thread = threading.Thread(target=self.run, name='boids simulation', daemon=True)
+
+        #Publish the initial flock twice so that there is always a pair of snapshots to interpolate:
+        closest_index = self.find_closest(edge_period(self.controls['edges']))
+        self.publish(closest_index)
+        self.publish(closest_index)
+
+
+    def start(self):
+        '''
+        Description:
+            Start the worker thread.
+        '''
+        self.thread.start()
+        return self
+
+
+    def set_controls(self, **controls):
+        '''
+        Description:
+            Set the toggles used by the next steps: separation, alignment, cohesion, edges and paused.
+        Input:
+            controls: toggle values by name. dtype: bool
+        '''
+        with self.lock:
+            self.controls.update(controls)
+        return
+
+
+    def resize(self, N):
+        '''
+        Description:
+            Request a new number of boids, applied by the worker before its next step. See Flock.resize.
+        Input:
+            N: new number of boids. dtype: int
+        '''
+        with self.lock:
+            self.pending_N = N
+        return
+
+
+    def save_checkpoint(self, path, toggles=None):
+        '''
+        Description:
+            Request a checkpoint of the flock, saved by the worker before its next step. See
+            Boids_Checkpoint.save_checkpoint.
+        Input:
+            path: checkpoint file path. dtype: str
+            toggles: toggle values by name saved with the flock. dtype: dict
+        '''
+        with self.lock:
+            self.pending_checkpoint = (path, toggles)
+        return
+
+
+    def find_closest(self, period=None):
+        '''
+        Description:
+            Closest boid of each boid of the flock.
+        Input:
+            period: period of the periodic edges, see edge_period. dtype: tuple
+        Output:
+            closest_index: index of the closest boid of each boid. dtype: 1D int array
+        '''
+        if period is not None:
+            return find_closest(self.flock.t_x0_i, self.flock.t_y0_i, period=period)
+        return SpatialGrid(self.flock.t_x0_i, self.flock.t_y0_i, scale=(1.0, sim_var['height']/sim_var['width'])).query_nearest()
+
+
+    def publish(self, closest_index):
+        '''
+        Description:
+            Copy the flock in the back snapshot, then make it the latest published snapshot.
+        Input:
+            closest_index: index of the closest boid of each boid. dtype: 1D int array
+        '''
+        flock = self.flock
+        slot = self.slots[self.back]
+        for key in snapshot_arrays:
+            if key not in slot or len(slot[key]) < flock.N:
+                slot[key] = np.empty(flock.capacity, dtype=getattr(flock, key).dtype)
+            slot[key][:flock.N] = getattr(flock, key)
+        slot['N'] = flock.N
+        slot['closest'] = int(closest_index[0]) if flock.N > 0 else 0
+        slot['step'] = self.step_count
+        with self.lock:
+            slot['time'] = time.perf_counter()
+            self.previous, self.latest, self.back = self.latest, self.back, self.previous
+        return
+
+
+    def run(self):
+        '''
+        Description:
+            Worker loop: apply controls, resize and save checkpoints, loop around edges, find closest boids, publish and step the flock,
+            then wait for the next fixed timestep.
+        '''
+        try:
+            next_time = time.perf_counter()
+            while not self.stop_event.is_set():
+                with self.lock:
+                    controls = dict(self.controls)
+                    N, self.pending_N = self.pending_N, None
+                    checkpoint, self.pending_checkpoint = self.pending_checkpoint, None
+                if N is not None and N != self.flock.N:
+                    self.flock.resize(N)
+                if checkpoint is not None:
+                    save_checkpoint(checkpoint[0], self.flock, toggles=checkpoint[1])
+
+                period = edge_period(controls['edges'])
+                if controls['edges']:
+                    self.flock.loop_around_edges()
+                closest_index = self.find_closest(period)
+                self.publish(closest_index)
+                if self.recorder is not None and not controls['paused']:
+                    self.recorder.write(self.flock.t_x0_i, self.flock.t_y0_i, self.flock.t_angle_i, self.flock.t_colors)
+                if self.stream is not None:
+                    self.stream.publish(self.step_count, self.flock.t_x0_i, self.flock.t_y0_i, self.flock.t_angle_i, self.flock.t_colors)
+                self.flock.step(closest_index, separation=controls['separation'], alignment=controls['alignment'],
+                                cohesion=controls['cohesion'], paused=controls['paused'], period=period)
+                if not controls['paused']:
+                    self.step_count += 1
+
+                #Fixed timestep, the worker does not try to catch up more than max_lag:
+                if self.speed > 0:
+                    next_time += 1 / (sim_var['fps'] * self.speed)
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        self.stop_event.wait(delay)
+                    elif delay < -self.max_lag:
+                        next_time = time.perf_counter()
+                else:
+                    time.sleep(0) #Let the render thread run
+        except Exception as error:
+            self.error = error
+        return
+
+
+    def interpolate(self, now=None):
+        '''
+        Description:
+            Flock to draw at a given time, interpolated between the two published snapshots. The display is
+            one snapshot interval behind the latest snapshot. Boids which looped around the edges or were
+            just added are drawn at their latest position.
+        Input:
+            now: time to draw the flock at, from time.perf_counter. Default: now. dtype: float
+        Output:
+            t_x0_i, t_y0_i: relative center coordinates of boids. dtype: 1D array
+            t_angle_i: boids orientation angle. unit: rad. dtype: 1D array
+            t_colors: boids colors, indices in the palette. Can be changed by the caller. dtype: 1D uint8 array
+            closest: index of the closest boid of the case study boid. dtype: int
+        '''
+        if self.error is not None:
+            raise RuntimeError('Simulation thread stopped.') from self.error
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            previous, latest = self.slots[self.previous], self.slots[self.latest]
+            N, n = latest['N'], min(latest['N'], previous['N'])
+            interval = latest['time'] - previous['time']
+            alpha = 1.0 if interval <= 0 else min(max((now - latest['time']) / interval, 0.0), 1.0)
+
+            if 'mask' not in self.render or len(self.render['mask']) < N:
+                self.render = {key: np.empty_like(latest[key]) for key in snapshot_arrays}
+                self.render['difference'] = np.empty_like(latest['t_x0_i'])
+                self.render['mask'] = np.empty(len(latest['t_x0_i']), dtype=bool)
+            difference, mask = self.render['difference'][:n], self.render['mask'][:n]
+            for key in snapshot_arrays:
+                render = self.render[key][:N]
+                render[n:] = latest[key][n:N]
+                if key == 't_colors':
+                    render[:n] = latest[key][:n]
+                    continue
+                np.subtract(latest[key][:n], previous[key][:n], out=difference)
+                np.multiply(difference, alpha - 1, out=render[:n])
+                render[:n] += latest[key][:n]
+                if key != 't_angle_i':
+                    np.abs(difference, out=difference)
+                    np.greater(difference, loop_around_jump, out=mask)
+                    np.copyto(render[:n], latest[key][:n], where=mask)
+            closest = latest['closest']
+        return self.render['t_x0_i'][:N], self.render['t_y0_i'][:N], self.render['t_angle_i'][:N], self.render['t_colors'][:N], closest
+
+
+    def close(self):
+        '''
+        Description:
+            Stop the worker thread.
+        '''
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        return
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+#----------------------------------------------
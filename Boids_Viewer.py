@@ -0,0 +1,131 @@
+#-----------------------------------------------------
+#BOIDS STREAM VIEWER CODE
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import asyncio
+import argparse
+import json
+import os
+from Boids_Sim import sim_var, palette
+from Boids_Stream import open_stream, read_message, next_frame
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#USE PARSER FOR COMMAND LINE ARGUMENTS
+parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter,
+        description='Viewer of a Boids simulation streamed with Boids_GUI.py --stream. Only draws the boids, the\nsimulation runs in the streaming process.',
+        epilog = 'For more information on this software, contact Jordan Ducatel at jfducatel@gmail.com.')
+parser.add_argument('address',
+                    help='Stream server address: HOST:PORT or PORT for TCP, unix:PATH for a Unix socket.')
+parser.add_argument('--render-mode', choices=('auto', 'triangles', 'points', 'density', 'heading'), default='auto',
+                    help='Flock render mode, the M key cycles the modes. Default: auto')
+parser.add_argument('--fps', type=int, default=sim_var['fps'],
+                    help='Display frame rate. Default: {}'.format(sim_var['fps']))
+args = parser.parse_args()
+#----------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT GUI MODULES
+import pygame
+from Boids_Render import color, render_modes, draw_flock
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+#Define viewer coroutine:
+async def view(address, render_mode, fps):
+    '''
+    Description:
+        Connect to a stream server and draw its latest frame at a fixed frame rate until the window is
+        closed or the stream ends. The next frame is requested as soon as a frame is received, so the
+        server skips the frames published while this viewer is drawing.
+    Input:
+        address: stream server address, see Boids_Stream.parse_address. dtype: str
+        render_mode: flock render mode, one of Boids_Render.render_modes. dtype: str
+        fps: display frame rate. dtype: int
+    '''
+    reader, writer = await open_stream(address)
+    kind, payload = await read_message(reader)
+    info = json.loads(payload.decode())
+    if kind != b'INFO' or info['palette'] != palette:
+        raise ValueError('Stream {} does not use the boids palette of this viewer.'.format(address))
+    sim_var.update(info['sim_var'])
+
+    #Setup pygame window, only the simulation viewport is shown:
+    os.environ["SDL_VIDEO_CENTERED"]='1'
+    pygame.init()
+    pygame.display.set_caption("Boid Simulation Viewer - {}".format(address))
+    screen = pygame.display.set_mode((sim_var['width'], sim_var['height']))
+    viewport_rect = screen.get_rect()
+
+    #Boxes are drawn once on a cached background:
+    background = pygame.Surface(screen.get_size()).convert()
+    background.fill(color['darkgray'])
+    pygame.draw.rect(background, color['lightgray'],
+                     (sim_var['bounding box scale']*sim_var['width'],
+                      sim_var['bounding box scale']*sim_var['height'],
+                      (1-2*sim_var['bounding box scale'])*sim_var['width'],
+                      (1-2*sim_var['bounding box scale'])*sim_var['height']),
+                     width=3)
+    pygame.draw.rect(background, color['white'],
+                     ((sim_var['bounding box scale'] - sim_var['loop around buffer'])*sim_var['width'],
+                      (sim_var['bounding box scale'] - sim_var['loop around buffer'])*sim_var['height'],
+                      (1-2*(sim_var['bounding box scale'] - sim_var['loop around buffer']))*sim_var['width'],
+                      (1-2*(sim_var['bounding box scale'] - sim_var['loop around buffer']))*sim_var['height']),
+                     width=3)
+    font = pygame.font.Font('freesansbold.ttf', 11)
+
+    request = asyncio.ensure_future(next_frame(reader, writer))
+    frame = None
+    frames_drawn = 0
+    redraw = False
+    run = True
+    while run:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                run = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                render_mode = render_modes[(render_modes.index(render_mode) + 1) % len(render_modes)]
+                redraw = True
+
+        #Latest frame received, the next one is requested at once:
+        if request.done():
+            try:
+                frame = request.result()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                print('Stream {} ended after {} frames drawn.'.format(address, frames_drawn))
+                break
+            request = asyncio.ensure_future(next_frame(reader, writer))
+            redraw = True
+
+        if frame is not None and redraw:
+            step, t_x0_i, t_y0_i, t_angle_i, t_colors = frame
+            screen.blit(background, (0, 0))
+            mode = draw_flock(screen, viewport_rect, t_x0_i, t_y0_i, t_angle_i, t_colors, mode=render_mode)
+            text = 'Step {}  Boids {}  {}'.format(step, len(t_x0_i), mode)
+            screen.blit(font.render(text, True, color['lightgray'], color['darkgray']), (6, 6))
+            pygame.display.update()
+            frames_drawn += 1
+            redraw = False
+        await asyncio.sleep(1 / fps)
+
+    request.cancel()
+    writer.close()
+    pygame.quit()
+    return
+#----------------------------------------------
+
+
+#----------------------------------------------
+#RUN VIEWER:
+if __name__ == '__main__':
+    asyncio.run(view(args.address, args.render_mode, args.fps))
+#----------------------------------------------
@@ -0,0 +1,27 @@
+#-----------------------------------------------------
+#BOIDS TESTS CONFIGURATION
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import pytest
+from Boids_Sim import sim_var
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+@pytest.fixture(autouse=True)
+def restore_sim_var():
+    '''
+    Description:
+        Restore the simulation variables changed by a test, e.g. by load_checkpoint.
+    '''
+    saved = dict(sim_var)
+    yield
+    sim_var.clear()
+    sim_var.update(saved)
+#----------------------------------------------
@@ -0,0 +1,60 @@
+#-----------------------------------------------------
+#BOIDS CHECKPOINT TESTS
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import pytest
+from Boids_Sim import sim_var, Flock, SpatialGrid, find_closest, edge_period
+from Boids_Checkpoint import save_checkpoint, load_checkpoint
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+def simulate(flock, steps, period=None):
+    '''
+    Description:
+        Simulate a flock in place, as the headless mode does.
+    '''
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    for step in range(steps):
+        flock.loop_around_edges()
+        if period is not None:
+            closest_index = find_closest(flock.t_x0_i, flock.t_y0_i, period=period)
+        else:
+            closest_index = SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest()
+        flock.step(closest_index, period=period)
+    return flock
+#----------------------------------------------
+
+
+#----------------------------------------------
+#CHECKPOINT
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('periodic', [False, True])
+def test_checkpoint_continues_bit_for_bit(tmp_path, dtype, periodic):
+    sim_var['periodic edges'] = periodic
+    period = edge_period()
+    reference = simulate(Flock(250, dtype=dtype, seed=9), 200, period)
+
+    flock = simulate(Flock(250, dtype=dtype, seed=9), 100, period)
+    save_checkpoint(str(tmp_path / 'checkpoint.npz'), flock, toggles={'paused': False})
+    sim_var['periodic edges'] = not periodic
+    restored, toggles = load_checkpoint(str(tmp_path / 'checkpoint.npz'))
+    assert sim_var['periodic edges'] == periodic
+    simulate(restored, 100, period)
+
+    assert toggles == {'paused': False} and restored.dtype == np.dtype(dtype)
+    for key in Flock.flock_arrays:
+        np.testing.assert_array_equal(getattr(restored, key), getattr(reference, key))
+
+    #New boids are drawn from the restored random number generator:
+    reference.resize(300)
+    restored.resize(300)
+    np.testing.assert_array_equal(restored.t_x0_i, reference.t_x0_i)
+#----------------------------------------------
@@ -0,0 +1,35 @@
+#-----------------------------------------------------
+#BOIDS PARALLEL ENGINE TESTS
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+import pytest
+from Boids_Sim import Flock, run_headless
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#PARALLEL STEERING
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_parallel_run_matches_serial_run(capsys, dtype):
+    serial = run_headless(3000, 20, dtype=dtype, seed=5)
+    parallel = run_headless(3000, 20, dtype=dtype, seed=5, processes=3)
+    capsys.readouterr()
+    assert parallel.N == serial.N
+    for key in Flock.flock_arrays:
+        np.testing.assert_array_equal(getattr(parallel, key), getattr(serial, key))
+
+
+def test_parallel_run_matches_serial_run_without_rules(capsys):
+    toggles = {'separation': False, 'alignment': False, 'cohesion': False, 'edges': False}
+    serial = run_headless(2000, 10, seed=8, **toggles)
+    parallel = run_headless(2000, 10, seed=8, processes=2, **toggles)
+    capsys.readouterr()
+    for key in Flock.flock_arrays:
+        np.testing.assert_array_equal(getattr(parallel, key), getattr(serial, key))
+#----------------------------------------------
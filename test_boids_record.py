@@ -0,0 +1,40 @@
+#-----------------------------------------------------
+#BOIDS RECORDING TESTS
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+from Boids_Sim import Flock, SpatialGrid
+from Boids_Record import Recorder, Replay
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#INDEX UPDATES
+def test_recording_is_readable_before_close(tmp_path):
+    flock = Flock(50, seed=2)
+    frames = []
+    recorder = Recorder(str(tmp_path), chunk_frames=10, index_frames=4)
+    for step in range(13):
+        recorder.write(flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, flock.t_colors)
+        frames.append(flock.t_x0_i.astype(np.float32))
+        if step == 0:
+            assert len(Replay(str(tmp_path))) == 0 #Index written with the first chunk
+        flock.loop_around_edges()
+        flock.step(SpatialGrid(flock.t_x0_i, flock.t_y0_i).query_nearest())
+
+    #Not closed, as after a crash: frames up to the last index update are readable:
+    replay = Replay(str(tmp_path))
+    assert len(replay) == 12 and len(replay.chunks) == 2
+    for frame in range(len(replay)):
+        np.testing.assert_array_equal(replay.frame(frame)[0], frames[frame])
+
+    recorder.close()
+    replay = Replay(str(tmp_path))
+    assert len(replay) == 13
+    np.testing.assert_array_equal(replay.frame(-1)[0], frames[-1])
+#----------------------------------------------
@@ -0,0 +1,223 @@
+#-----------------------------------------------------
+#BOIDS SIMULATION TESTS
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import tracemalloc
+import numpy as np
+import pytest
+from Boids_Sim import (sim_var, Flock, SpatialGrid, edge_period, find_closest, flock_clusters, flock_statistics,
+                       loop_around_edges, steer_boids, step_boids)
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE VARIABLES
+#Weights of the x and y coordinates in distances, as in the simulation:
+scale = (1.0, sim_var['height']/sim_var['width'])
+#----------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+def brute_force_distance2(t_x0_i, t_y0_i, index=None):
+    '''
+    Description:
+        Squared weighted distance of every boid, or of the boids in index, to its closest other boid,
+        comparing all pairs.
+    '''
+    index = np.arange(len(t_x0_i)) if index is None else index
+    distance2 = (((t_x0_i[index, None] - t_x0_i[None, :]) * scale[0])**2 +
+                 ((t_y0_i[index, None] - t_y0_i[None, :]) * scale[1])**2)
+    distance2[np.arange(len(index)), index] = np.inf
+    return distance2.min(axis=1)
+
+
+def closest_distance2(t_x0_i, t_y0_i, closest_index, index=None):
+    '''
+    Description:
+        Squared weighted distance of every boid, or of the boids in index, to the boid found as its closest.
+    '''
+    index = np.arange(len(t_x0_i)) if index is None else index
+    return (((t_x0_i[index] - t_x0_i[closest_index]) * scale[0])**2 +
+            ((t_y0_i[index] - t_y0_i[closest_index]) * scale[1])**2)
+
+
+def brute_force_clusters(t_x0_i, t_y0_i, radius, period=None):
+    '''
+    Description:
+        Cluster of every boid as its smallest linked boid index, spreading labels over all pairs within radius,
+        with minimum image distances if a period is given.
+    '''
+    dx, dy = t_x0_i[:, None] - t_x0_i[None, :], t_y0_i[:, None] - t_y0_i[None, :]
+    if period is not None:
+        dx, dy = dx - np.rint(dx / period[0]) * period[0], dy - np.rint(dy / period[1]) * period[1]
+    linked = (dx * scale[0])**2 + (dy * scale[1])**2 <= radius**2
+    labels = np.arange(len(t_x0_i))
+    while True:
+        labels_new = np.where(linked, labels[None, :], len(labels)).min(axis=1)
+        if np.array_equal(labels_new, labels):
+            return labels
+        labels = labels_new
+
+
+def simulate(flock, steps):
+    '''
+    Description:
+        Simulate a flock in place, closest boids searched with the spatial grid.
+    '''
+    for step in range(steps):
+        flock.loop_around_edges()
+        flock.step(SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest())
+    return flock
+#----------------------------------------------
+
+
+#----------------------------------------------
+#CLOSEST BOID SEARCH
+@pytest.mark.parametrize('N', [2, 3, 50, 2000])
+def test_grid_nearest_matches_brute_force(N):
+    rng = np.random.default_rng(N)
+    t_x0_i, t_y0_i = rng.random(N), rng.random(N)
+    t_x0_i[N // 2:] = 0.5 + 0.01 * t_x0_i[N // 2:] #Dense cluster and sparse boids
+    closest_index = SpatialGrid(t_x0_i, t_y0_i, scale=scale).query_nearest()
+    assert np.all(closest_index != np.arange(N))
+    np.testing.assert_array_equal(closest_distance2(t_x0_i, t_y0_i, closest_index), brute_force_distance2(t_x0_i, t_y0_i))
+
+
+def test_grid_nearest_subset_and_single_boid():
+    rng = np.random.default_rng(1)
+    t_x0_i, t_y0_i = rng.random(500), rng.random(500)
+    index = np.array([3, 10, 499])
+    closest_index = SpatialGrid(t_x0_i, t_y0_i, scale=scale).query_nearest(index=index)
+    np.testing.assert_array_equal(closest_distance2(t_x0_i, t_y0_i, closest_index, index),
+                                  brute_force_distance2(t_x0_i, t_y0_i, index))
+    assert SpatialGrid(t_x0_i[:1], t_y0_i[:1]).query_nearest().tolist() == [0]
+
+
+def test_grid_chunks_match_unchunked_search():
+    rng = np.random.default_rng(7)
+    t_x0_i, t_y0_i = rng.random(3000), rng.random(3000)
+    t_x0_i[:1000], t_y0_i[:1000] = 0.2 + 0.005 * t_x0_i[:1000], 0.7 + 0.005 * t_y0_i[:1000]
+    grid, chunked = SpatialGrid(t_x0_i, t_y0_i, scale=scale), SpatialGrid(t_x0_i, t_y0_i, scale=scale, chunk_pairs=500)
+    pair_i, pair_j = grid.candidates(reach=2)
+    chunks = list(chunked.candidate_chunks(reach=2))
+    assert len(chunks) > 1
+    np.testing.assert_array_equal(np.concatenate([chunk[0] for chunk in chunks]), pair_i)
+    np.testing.assert_array_equal(np.concatenate([chunk[1] for chunk in chunks]), pair_j)
+    np.testing.assert_array_equal(chunked.query_nearest(), grid.query_nearest())
+    for expected, found in zip(grid.query_radius(0.01), chunked.query_radius(0.01)):
+        np.testing.assert_array_equal(found, expected)
+
+
+def test_grid_nearest_memory_is_bounded_in_dense_region():
+    #Half the boids in a tiny square share a few cells, about 25 million candidate pairs:
+    N = 10000
+    rng = np.random.default_rng(3)
+    t_x0_i, t_y0_i = rng.random(N), rng.random(N)
+    t_x0_i[N // 2:], t_y0_i[N // 2:] = 0.5 + 0.001 * t_x0_i[N // 2:], 0.5 + 0.001 * t_y0_i[N // 2:]
+    tracemalloc.start()
+    try:
+        closest_index = SpatialGrid(t_x0_i, t_y0_i, scale=scale).query_nearest()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 200 * 2**20
+    index = rng.choice(N, 200, replace=False)
+    np.testing.assert_array_equal(closest_distance2(t_x0_i, t_y0_i, closest_index[index], index),
+                                  brute_force_distance2(t_x0_i, t_y0_i, index))
+#----------------------------------------------
+
+
+#----------------------------------------------
+#FLOCK STEP
+def test_flock_step_is_deterministic():
+    flock_1, flock_2 = simulate(Flock(300, seed=11), 50), simulate(Flock(300, seed=11), 50)
+    for key in Flock.flock_arrays:
+        np.testing.assert_array_equal(getattr(flock_1, key), getattr(flock_2, key))
+
+
+@pytest.mark.parametrize('toggles', [{}, {'separation': False}, {'alignment': False, 'cohesion': False}])
+def test_flock_steer_matches_steer_boids(toggles):
+    flock = simulate(Flock(400, seed=2), 10)
+    closest_index = SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest()
+    expected = steer_boids(flock.t_x0_i.copy(), flock.t_y0_i.copy(), flock.t_angle_i.copy(), flock.t_vx0_i.copy(),
+                           flock.t_vy0_i.copy(), closest_index, **toggles)
+    np.testing.assert_array_equal(flock.steer(closest_index, **toggles), expected)
+
+
+def test_flock_step_in_place_matches_allocating_step():
+    keys = ('t_x0_i', 't_y0_i', 't_angle_i', 't_vx0_i', 't_vy0_i')
+    flock = Flock(300, seed=4)
+    arrays = [getattr(flock, key).copy() for key in keys]
+    buffers = [getattr(flock, key) for key in keys]
+    for step in range(30):
+        arrays[0], arrays[1] = loop_around_edges(arrays[0], arrays[1])
+        flock.loop_around_edges()
+        closest_index = SpatialGrid(arrays[0], arrays[1], scale=scale).query_nearest()
+        arrays = list(step_boids(*arrays, closest_index=closest_index))
+        flock.step(closest_index)
+    for key, array in zip(keys, arrays):
+        np.testing.assert_array_equal(getattr(flock, key), array)
+    #Positions and velocities are stepped in their own buffers, headings swap with the new heading buffer:
+    for key, buffer in zip(keys, buffers):
+        if key != 't_angle_i':
+            assert np.shares_memory(getattr(flock, key), buffer)
+#----------------------------------------------
+
+
+#----------------------------------------------
+#CLUSTERS
+@pytest.mark.parametrize('radius', [0.003, 0.02, 0.05, 0.2])
+def test_clusters_match_brute_force(radius):
+    rng = np.random.default_rng(8)
+    t_x0_i, t_y0_i = rng.random(1500), rng.random(1500)
+    t_x0_i[:500], t_y0_i[:500] = 0.6 + 0.02 * t_x0_i[:500], 0.3 + 0.02 * t_y0_i[:500] #Dense cluster
+    labels = brute_force_clusters(t_x0_i, t_y0_i, radius)
+    np.testing.assert_array_equal(flock_clusters(t_x0_i, t_y0_i, radius, scale=scale), labels)
+    np.testing.assert_array_equal(flock_clusters(t_x0_i, t_y0_i, radius, scale=scale, chunk_pairs=100), labels)
+
+
+def test_periodic_statistics_use_minimum_image_distances():
+    sim_var['periodic edges'] = True
+    period = edge_period()
+    low = sim_var['bounding box scale'] - sim_var['loop around buffer']
+    rng = np.random.default_rng(6)
+    t_x0_i, t_y0_i = low + period[0] * rng.random(800), low + period[1] * rng.random(800)
+    t_x0_i[:100] = low + 0.002 * rng.random(100) #Dense band split by the edge
+    t_x0_i[100:200] = low + period[0] - 0.002 * rng.random(100)
+    for radius in (0.01, 0.04):
+        np.testing.assert_array_equal(flock_clusters(t_x0_i, t_y0_i, radius, scale=scale, period=period),
+                                      brute_force_clusters(t_x0_i, t_y0_i, radius, period=period))
+
+    dx, dy = t_x0_i[:, None] - t_x0_i[None, :], t_y0_i[:, None] - t_y0_i[None, :]
+    dx, dy = dx - np.rint(dx / period[0]) * period[0], dy - np.rint(dy / period[1]) * period[1]
+    distance2 = (dx * scale[0])**2 + (dy * scale[1])**2
+    np.fill_diagonal(distance2, np.inf)
+    closest_index = find_closest(t_x0_i, t_y0_i, period=period)
+    statistics = flock_statistics(t_x0_i, t_y0_i, np.zeros(800), closest_index, period=period)
+    distance = np.sqrt(dx[np.arange(800), closest_index]**2 + dy[np.arange(800), closest_index]**2)
+    np.testing.assert_array_equal(distance2[np.arange(800), closest_index], distance2.min(axis=1))
+    assert statistics['mean nearest distance'] == pytest.approx(np.mean(distance))
+    assert statistics['mean nearest distance'] < np.mean(np.sqrt((t_x0_i - t_x0_i[closest_index])**2 +
+                                                                 (t_y0_i - t_y0_i[closest_index])**2))
+
+
+def test_clusters_memory_is_bounded_at_large_N():
+    #More than a billion boid pairs within the cohesion scale, most in the dense half:
+    rng = np.random.default_rng(4)
+    t_x0_i, t_y0_i = rng.random(100000), rng.random(100000)
+    t_x0_i[:50000], t_y0_i[:50000] = 0.2 + 0.1 * t_x0_i[:50000], 0.2 + 0.1 * t_y0_i[:50000]
+    tracemalloc.start()
+    try:
+        labels = flock_clusters(t_x0_i, t_y0_i, sim_var['cohesion scale'], scale=scale)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 100 * 2**20
+    assert np.all(labels == 0)
+#----------------------------------------------
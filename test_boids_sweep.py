@@ -0,0 +1,53 @@
+#-----------------------------------------------------
+#BOIDS PARAMETER SWEEP TESTS
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import numpy as np
+from Boids_Sim import sim_var, Flock, SpatialGrid, initialize_boids, flock_statistics
+from Boids_Sweep import run_sweep
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#DEFINE FUNCTION:
+def run_alone(configuration, N, steps, seed, cluster_radius):
+    '''
+    Description:
+        Simulate the flock of one configuration on its own, with the configuration set in sim_var.
+    '''
+    scale = (1.0, sim_var['height']/sim_var['width'])
+    saved = dict(sim_var)
+    sim_var.update(configuration)
+    flock = Flock(N)
+    for key, array in zip(('t_x0_i', 't_y0_i', 't_angle_i', 't_vx0_i', 't_vy0_i', 't_colors'),
+                          initialize_boids(N, rng=np.random.default_rng(seed))):
+        getattr(flock, key)[:] = array
+    for step in range(steps):
+        flock.loop_around_edges()
+        flock.step(SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest())
+    closest_index = SpatialGrid(flock.t_x0_i, flock.t_y0_i, scale=scale).query_nearest()
+    statistics = flock_statistics(flock.t_x0_i, flock.t_y0_i, flock.t_angle_i, closest_index, cluster_radius=cluster_radius)
+    sim_var.clear()
+    sim_var.update(saved)
+    return statistics
+#----------------------------------------------
+
+
+#----------------------------------------------
+#BATCHED FLOCKS
+def test_batched_flocks_match_flocks_run_one_by_one():
+    configurations = [{'collision strength': 0.5, 'alignment strength': 0.1, 'cohesion scale': 0.05},
+                      {'collision strength': 2.0, 'alignment strength': 0.1, 'cohesion scale': 0.05},
+                      {'collision strength': 0.5, 'alignment strength': 0.3, 'cohesion scale': 0.03},
+                      {'collision strength': 2.0, 'alignment strength': 0.3, 'cohesion scale': 0.08}]
+    results = run_sweep(configurations, 200, 40, seed=3, cluster_radius=0.05, batch_size=3)
+    for configuration, result in zip(configurations, results):
+        assert {key: result[key] for key in configuration} == configuration
+        statistics = run_alone(configuration, 200, 40, seed=3, cluster_radius=0.05)
+        assert {key: result[key] for key in statistics} == statistics
+#----------------------------------------------
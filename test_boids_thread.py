@@ -0,0 +1,42 @@
+#-----------------------------------------------------
+#BOIDS SIMULATION THREAD TESTS
+#Last Updated: Oct. 17, 2026
+#See README.md file for information
+#-----------------------------------------------------
+
+
+#-----------------------------------------------------
+#IMPORT MODULES
+import time
+import numpy as np
+import pytest
+from Boids_Sim import sim_var, Flock, edge_period
+from Boids_Thread import SimulationThread
+#-----------------------------------------------------
+
+
+#----------------------------------------------
+#INITIAL CONTROLS
+def test_thread_started_paused_does_not_step():
+    flock = Flock(200, seed=3)
+    t_x0_i, t_angle_i = flock.t_x0_i.copy(), flock.t_angle_i.copy()
+    with SimulationThread(flock, speed=0, controls={'paused': True, 'edges': False}) as sim_thread:
+        time.sleep(0.2)
+        assert sim_thread.controls['paused'] and sim_thread.controls['separation']
+    assert sim_thread.error is None and sim_thread.step_count == 0
+    np.testing.assert_array_equal(flock.t_x0_i, t_x0_i)
+    np.testing.assert_array_equal(flock.t_angle_i, t_angle_i)
+
+
+@pytest.mark.parametrize('edges, closest', [(True, 1), (False, 2)])
+def test_initial_closest_boid_follows_edges_control(edges, closest):
+    #Boid 1 is closest to boid 0 across the periodic edge, boid 2 without the wrap:
+    sim_var['periodic edges'] = True
+    period = edge_period()
+    low = sim_var['bounding box scale'] - sim_var['loop around buffer']
+    flock = Flock(3, seed=1)
+    flock.t_x0_i[:] = [low + 0.001, low + period[0] - 0.001, low + 0.05]
+    flock.t_y0_i[:] = 0.5
+    sim_thread = SimulationThread(flock, controls={'edges': edges, 'paused': True})
+    assert sim_thread.interpolate()[4] == closest
+#----------------------------------------------